@@ -3,6 +3,7 @@ use std::sync::OnceLock;
 
 use opentelemetry::trace::TracerProvider;
 use tracing_opentelemetry::OpenTelemetryLayer;
+use tracing_subscriber::fmt::format::FmtSpan;
 use tracing_subscriber::layer::SubscriberExt;
 use tracing_subscriber::util::SubscriberInitExt;
 use tracing_subscriber::EnvFilter;
@@ -75,6 +76,9 @@ impl Metrics {
 /// Guard returned by `init()`. Call `shutdown()` to print the metrics summary.
 pub struct TelemetryGuard;
 
+/// Environment variable naming a file to receive span-close records as JSON lines.
+pub const TRACE_FILE_ENV: &str = "AG_TRACE_FILE";
+
 /// Initialise tracing + metrics. Call once at startup.
 pub fn init() -> TelemetryGuard {
     METRICS.get_or_init(Metrics::new);
@@ -83,6 +87,16 @@ pub fn init() -> TelemetryGuard {
     let tracer = tracer_provider.tracer("artifact-generator");
     let otel_layer = OpenTelemetryLayer::new(tracer);
 
+    // Optional span log, merged with Python writer traces by `ag-trace-merge`.
+    let span_file_layer = std::env::var_os(TRACE_FILE_ENV).map(|path| {
+        let file = std::fs::File::create(&path).expect("cannot create AG_TRACE_FILE");
+        tracing_subscriber::fmt::layer()
+            .json()
+            .with_span_events(FmtSpan::CLOSE)
+            .with_span_list(true)
+            .with_writer(std::sync::Mutex::new(file))
+    });
+
     let env_filter = EnvFilter::try_from_default_env()
         .unwrap_or_else(|_| EnvFilter::new("artifact_generator=info"));
 
@@ -94,6 +108,7 @@ pub fn init() -> TelemetryGuard {
                 .with_writer(std::io::stderr),
         )
         .with(otel_layer)
+        .with(span_file_layer)
         .init();
 
     TelemetryGuard
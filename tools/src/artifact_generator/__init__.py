@@ -2,7 +2,7 @@ import tiktoken
 from tokenizers import Tokenizer
 
 from artifact_generator.assets import load_dashboard
-from artifact_generator.corpus import build_html, CHUNK_SIZE
+from artifact_generator.corpus import build_corpus, build_html, CHUNK_SIZE, FAMILIES
 
 HF_TOKENIZERS = ["gpt2", "bert-base-uncased", "google/gemma-3-1b-it"]
 TT_ENCODINGS = ["o200k_base", "cl100k_base"]
@@ -22,10 +22,37 @@ def make_tokenizer(name: str):
     return lambda text: tok.encode(text).ids, tok.decode
 
 
+def make_offset_encoder(name: str):
+    """Return encode_fn(text) -> (ids, starts).
+
+    starts[i] is the character offset in `text` where token i begins.
+    """
+    if name in TT_ENCODINGS:
+        enc = tiktoken.get_encoding(name)
+
+        def encode(text):
+            ids = enc.encode(text)
+            _, starts = enc.decode_with_offsets(ids)
+            return ids, starts
+
+        return encode
+
+    tok = Tokenizer.from_pretrained(name)
+
+    def encode(text):
+        encoding = tok.encode(text)
+        return encoding.ids, [start for start, _ in encoding.offsets]
+
+    return encode
+
+
 __all__ = [
+    "build_corpus",
     "build_html",
     "CHUNK_SIZE",
+    "FAMILIES",
     "load_dashboard",
+    "make_offset_encoder",
     "make_tokenizer",
     "HF_TOKENIZERS",
     "TT_ENCODINGS",
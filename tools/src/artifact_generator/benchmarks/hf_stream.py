@@ -5,51 +5,70 @@ Streams a large pre-built HTML dashboard via a tokenizer, token by token.
 Supports HuggingFace tokenizers (gpt2, bert-base-uncased, google/gemma-3-1b-it)
 and tiktoken encodings (o200k_base, cl100k_base).
 
-Usage: uv run --project python ag-hf-stream [output-path] [tokenizer]
+Usage: uv run --project python ag-hf-stream [output-path] [tokenizer] [--corpus NAME] [--size N] [--capture TRACE] [--queue N | --shm NAME]
 """
+import argparse
 import sys
 import time
 
 from artifact_generator import make_tokenizer
-from artifact_generator.assets import load_dashboard
+from artifact_generator.corpus import add_corpus_arguments, corpus_from_args
+from artifact_generator.pipeline import add_pipeline_arguments, open_writer, print_summary
+from artifact_generator.streamtrace import TraceCapture, add_capture_argument
+from artifact_generator.telemetry import Recorder
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/artifact.html"
-    tok_name = sys.argv[2] if len(sys.argv) > 2 else "gpt2"
+    parser = argparse.ArgumentParser(description="Stream a corpus token by token via a tokenizer")
+    parser.add_argument("path", nargs="?", default="/tmp/artifact.html", help="Output path")
+    parser.add_argument("tokenizer", nargs="?", default="gpt2", help="Tokenizer (default: gpt2)")
+    add_corpus_arguments(parser)
+    add_capture_argument(parser)
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    path, tok_name = args.path, args.tokenizer
+    capture = TraceCapture(args.capture)
+    rec = Recorder.from_env("ag-hf-stream")
 
     print(f"Tokenizer : {tok_name}")
     print(f"Output    : {path}")
+    print(f"Corpus    : {args.corpus}")
     print("Loading tokenizer...", end=" ", flush=True)
 
     try:
-        encode, decode = make_tokenizer(tok_name)
+        with rec.span("load_tokenizer", tokenizer=tok_name):
+            encode, decode = make_tokenizer(tok_name)
     except Exception as e:
         print(f"FAILED ({e})")
         sys.exit(1)
 
     print("done")
 
-    html = load_dashboard()
-    ids = encode(html)
-    tokens = [decode([id]) for id in ids]
+    with rec.span("load_corpus", corpus=args.corpus):
+        html = corpus_from_args(args)
+    with rec.span("encode", tokenizer=tok_name):
+        ids = encode(html)
+    with rec.span("decode", tokenizer=tok_name):
+        tokens = [decode([id]) for id in ids]
 
     total_tokens = len(tokens)
     total_bytes = len(html.encode())
     avg_chars = len(html) / total_tokens if total_tokens else 0
 
-    print(f"Corpus    : {total_bytes:,} bytes  |  {total_tokens:,} tokens  |  avg {avg_chars:.1f} chars/token")
+    print(f"Size      : {total_bytes:,} bytes  |  {total_tokens:,} tokens  |  avg {avg_chars:.1f} chars/token")
     print("Streaming...", end=" ", flush=True)
 
-    flushes = 0
+    chunks = 0
     t0 = time.perf_counter()
 
-    with open(path, "w") as f:
+    writer = open_writer(path, args.queue, args.backpressure, shm=args.shm, rec=rec)
+
+    with rec.span("stream", path=path, tokenizer=tok_name), writer as f:
         for token in tokens:
+            capture.record(token)
             f.write(token)
-            f.flush()
-            flushes += 1
-            if flushes % 1000 == 0:
+            chunks += 1
+            if chunks % 1000 == 0:
                 print(".", end="", flush=True)
 
     elapsed = time.perf_counter() - t0
@@ -65,9 +84,15 @@ def main():
     print(f"  Elapsed       : {elapsed:>10.2f} s")
     print(f"  Throughput    : {kbps:>10.1f} KB/s")
     print(f"  Tokens/sec    : {toks_sec:>10.0f}")
-    print(f"  Flushes       : {flushes:>10,}")
+    print(f"  Chunks        : {chunks:>10,}")
+    print_summary(f)
     print(f"{'-'*44}")
 
+    if rec.export():
+        print(f"Trace written to {rec.path}")
+    if capture.save():
+        print(f"Stream trace written to {capture.path}")
+
 
 if __name__ == "__main__":
     main()
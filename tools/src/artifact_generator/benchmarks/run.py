@@ -6,15 +6,24 @@ Compares HuggingFace tokenizers, tiktoken encodings, and fixed chunking across:
   - token count, avg chars/token, tokenize time, tokens/sec
   - simulated streaming throughput (file writes, no delay)
 
-Usage: uv run --project python ag-bench
+With --scaling, runs every tokenizer and writer across a geometric series of
+corpus sizes instead and reports fitted growth exponents (see scaling.py).
+With --sharded, compares single-shot encoding against sharded parallel
+encoding across worker counts (see sharded.py).
+
+Usage: uv run --project python ag-bench [--corpus NAME] [--size N] [--seed N]
+       uv run --project python ag-bench --scaling [--min-size N] [--max-size N] [--steps N] [--json PATH]
+       uv run --project python ag-bench --sharded [--workers 1 2 4 8] [--backend thread process] [--size N]
 """
+import argparse
 import time
 import tempfile
 import os
 
 from artifact_generator import make_tokenizer, HF_TOKENIZERS, TT_ENCODINGS
-from artifact_generator.assets import load_dashboard
-from artifact_generator.corpus import CHUNK_SIZE
+from artifact_generator.corpus import CHUNK_SIZE, add_corpus_arguments, corpus_from_args
+from artifact_generator.benchmarks import scaling, sharded
+from artifact_generator.sharding import BACKENDS
 
 N_REPS = 100
 
@@ -107,11 +116,43 @@ def fmt_k(n: float) -> str:
 
 
 def main():
-    print("Loading dashboard HTML...", end=" ", flush=True)
-    html = load_dashboard()
+    parser = argparse.ArgumentParser(description="Offline tokenizer benchmark")
+    add_corpus_arguments(parser)
+    parser.add_argument("--scaling", action="store_true",
+                        help="Benchmark across a geometric series of corpus sizes")
+    parser.add_argument("--min-size", type=int, default=16_000, help="Smallest corpus in chars (default: 16000)")
+    parser.add_argument("--max-size", type=int, default=4_000_000, help="Largest corpus in chars (default: 4000000)")
+    parser.add_argument("--steps", type=int, default=7, help="Number of sizes (default: 7)")
+    parser.add_argument("--json", metavar="PATH", help="Write the scaling series as JSON")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Compare single-shot and sharded parallel encoding of the corpus")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Worker counts for --sharded (default: 1 2 4 8)")
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="Pool backends for --sharded (default: thread process)")
+    args = parser.parse_args()
+
+    if args.scaling:
+        if args.size is not None:
+            parser.error("--size does not apply to --scaling; use --min-size/--max-size")
+        sizes = scaling.geometric_sizes(args.min_size, args.max_size, args.steps)
+        report = scaling.run_scaling(HF_TOKENIZERS + TT_ENCODINGS, args.corpus, sizes, args.seed)
+        scaling.print_scaling(report)
+        if args.json:
+            scaling.write_json(report, args.json)
+            print(f"Series written to {args.json}")
+        return
+
+    print(f"Loading {args.corpus} corpus...", end=" ", flush=True)
+    html = corpus_from_args(args)
     print(f"done  ({len(html):,} chars / {len(html.encode()):,} bytes)")
     print()
 
+    if args.sharded:
+        report = sharded.run_sharded(HF_TOKENIZERS + TT_ENCODINGS, html, args.workers, args.backend)
+        sharded.print_sharded(report)
+        return
+
     print(f"Benchmarking (tokenize x {N_REPS} reps each):")
     results = []
     for name in HF_TOKENIZERS + TT_ENCODINGS:
@@ -0,0 +1,230 @@
+"""
+Scaling-curve benchmark — runs each tokenizer and writer across a geometric
+series of corpus sizes and fits power-law growth curves (time ~ size^k).
+
+Memory is the growth of peak RSS while a fresh spawned process encodes and
+decodes the corpus, so the tokenizers' native (Rust) buffers are counted and
+the timed runs are not slowed by instrumentation.
+
+Exponents noticeably above 1 are flagged as superlinear. Run via
+`ag-bench --scaling`; `--json` writes the raw series for tracking over time.
+"""
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from artifact_generator import make_tokenizer
+from artifact_generator.corpus import CHUNK_SIZE, build_corpus
+
+METRICS = ["encode_s", "decode_s", "stream_s", "peak_rss_bytes"]
+SUPERLINEAR = 1.15  # exponent above which growth is flagged
+MIN_TIME = 0.2      # seconds of repeated runs per timing
+
+
+def geometric_sizes(lo: int, hi: int, steps: int) -> list[int]:
+    return sorted({int(round(s)) for s in np.geomspace(lo, hi, steps)})
+
+
+def time_best(fn, min_time: float = MIN_TIME, max_reps: int = 50) -> float:
+    """Best-of wall time for `fn`, repeating until `min_time` has elapsed."""
+    best = float("inf")
+    spent = 0.0
+    for _ in range(max_reps):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        spent += dt
+        if spent >= min_time:
+            break
+    return best
+
+
+def _max_rss() -> int:
+    """This process's peak resident set size in bytes.
+
+    On Linux this is VmHWM, which `_reset_max_rss` can reset; ru_maxrss also
+    folds in the peak of exited threads and would not drop.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _reset_max_rss():
+    """Reset the peak-RSS mark to current RSS where the kernel allows it (Linux
+    /proc/self/clear_refs); elsewhere growth is measured from the existing peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _chunk(html: str) -> list[str]:
+    return [html[i : i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE)]
+
+
+def _rss_growth(name: str | None, html: str) -> int:
+    """Runs in a fresh process: peak-RSS growth over one encode + decode of
+    `html` (`name` None for fixed chunking), after the tokenizer has loaded.
+
+    Loading the tokenizer or unpickling the corpus can peak above the run
+    itself, so the peak mark is reset first.
+    """
+    if name is None:
+        def run():
+            return _chunk(html)
+    else:
+        encode, decode = make_tokenizer(name)
+        encode("warm-up")
+
+        def run():
+            return [decode([i]) for i in encode(html)]
+    _reset_max_rss()
+    before = _max_rss()
+    run()
+    return max(_max_rss() - before, 0)
+
+
+def peak_rss(name: str | None, corpora: list[str]) -> list[int]:
+    """Peak-RSS growth for each corpus, one spawned process apiece."""
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn"), max_tasks_per_child=1) as pool:
+        return [pool.submit(_rss_growth, name, html).result() for html in corpora]
+
+
+def stream_chunks(chunks: list[str]) -> float:
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
+        tmp = f.name
+        t0 = time.perf_counter()
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+        elapsed = time.perf_counter() - t0
+    os.unlink(tmp)
+    return elapsed
+
+
+def fit_exponent(sizes, values) -> float | None:
+    """Least-squares slope of log(value) vs log(size)."""
+    x = np.log(np.asarray(sizes, dtype=float))
+    y = np.asarray(values, dtype=float)
+    keep = y > 0
+    if keep.sum() < 2:
+        return None
+    return float(np.polyfit(x[keep], np.log(y[keep]), 1)[0])
+
+
+def scale_tokenizer(name: str, corpora: list[str]) -> dict:
+    encode, decode = make_tokenizer(name)
+    series = {m: [] for m in METRICS}
+    series["tokens"] = []
+    for html in corpora:
+        ids = encode(html)
+        series["tokens"].append(len(ids))
+        series["encode_s"].append(time_best(lambda: encode(html)))
+        series["decode_s"].append(time_best(lambda: [decode([i]) for i in ids]))
+        tokens = [decode([i]) for i in ids]
+        series["stream_s"].append(stream_chunks(tokens))
+    series["peak_rss_bytes"] = peak_rss(name, corpora)
+    return series
+
+
+def scale_fixed(corpora: list[str]) -> dict:
+    series = {m: [] for m in METRICS}
+    series["tokens"] = []
+    for html in corpora:
+        chunks = _chunk(html)
+        series["tokens"].append(len(chunks))
+        series["encode_s"].append(time_best(lambda: _chunk(html)))
+        series["decode_s"].append(0.0)
+        series["stream_s"].append(stream_chunks(chunks))
+    series["peak_rss_bytes"] = peak_rss(None, corpora)
+    return series
+
+
+def run_scaling(names: list[str], corpus: str, sizes: list[int], seed: int) -> dict:
+    print(f"Building {len(sizes)} {corpus} corpora ({sizes[0]:,} .. {sizes[-1]:,} chars)...",
+          end=" ", flush=True)
+    corpora = [build_corpus(corpus, size, seed) for size in sizes]
+    actual = [len(html) for html in corpora]
+    print("done")
+
+    results = {}
+    for name in names:
+        print(f"  Scaling {name}...", end=" ", flush=True)
+        try:
+            results[name] = scale_tokenizer(name, corpora)
+            print("done")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    print(f"  Scaling Fixed {CHUNK_SIZE}-char chunks...", end=" ", flush=True)
+    results[f"Fixed {CHUNK_SIZE}-char chunks"] = scale_fixed(corpora)
+    print("done")
+
+    for series in results.values():
+        series["exponents"] = {m: fit_exponent(actual, series[m]) for m in METRICS}
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": corpus,
+        "seed": seed,
+        "sizes": actual,
+        "results": results,
+    }
+
+
+def _fmt_exp(k: float | None) -> str:
+    if k is None:
+        return "-"
+    return f"{k:.2f}" + ("*" if k > SUPERLINEAR else "")
+
+
+def print_scaling(report: dict):
+    sizes = report["sizes"]
+    flagged = []
+    for name, series in report["results"].items():
+        print()
+        print(name)
+        print("-" * 82)
+        print(f"{'Chars':>12} {'Tokens':>10} {'Encode ms':>10} {'Decode ms':>10} {'Stream ms':>10} {'RSS MB':>9}")
+        print("-" * 82)
+        for i, size in enumerate(sizes):
+            print(
+                f"{size:>12,} {series['tokens'][i]:>10,} {series['encode_s'][i] * 1000:>10.2f}"
+                f" {series['decode_s'][i] * 1000:>10.2f} {series['stream_s'][i] * 1000:>10.2f}"
+                f" {series['peak_rss_bytes'][i] / 2**20:>9.2f}"
+            )
+        exps = series["exponents"]
+        print("-" * 82)
+        print(
+            f"{'exponent k':>12} {'':>10} {_fmt_exp(exps['encode_s']):>10} {_fmt_exp(exps['decode_s']):>10}"
+            f" {_fmt_exp(exps['stream_s']):>10} {_fmt_exp(exps['peak_rss_bytes']):>9}"
+        )
+        flagged += [f"{name} {m}" for m, k in exps.items() if k is not None and k > SUPERLINEAR]
+
+    print()
+    print(f"Growth fitted as value ~ size^k; * marks superlinear (k > {SUPERLINEAR}).")
+    if flagged:
+        print("Superlinear: " + ", ".join(flagged))
+
+
+def write_json(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
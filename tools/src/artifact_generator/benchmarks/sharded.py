@@ -0,0 +1,72 @@
+"""
+Sharded tokenization benchmark — encodes one large corpus single-shot and
+through ShardedEncoder at several worker counts per backend, checks that the
+stitched ids match single-shot encoding exactly, and reports speedup.
+
+Pool start-up (and loading the tokenizer in process workers) is excluded from
+timings; shard pickling for the process backend is included. Run via
+`ag-bench --sharded`.
+"""
+import os
+
+from artifact_generator import make_tokenizer
+from artifact_generator.benchmarks.scaling import time_best
+from artifact_generator.sharding import ShardedEncoder, split_shards
+
+
+def shard_tokenizer(name: str, html: str, workers: list[int], backends: list[str]) -> dict:
+    encode, _ = make_tokenizer(name)
+    reference = encode(html)
+    single_s = time_best(lambda: encode(html))
+
+    rows = []
+    for backend in backends:
+        for n in workers:
+            with ShardedEncoder(name, workers=n, backend=backend) as enc:
+                ids = enc.encode(html)  # warm-up; also starts process workers
+                elapsed = time_best(lambda: enc.encode(html))
+                rows.append({
+                    "backend": backend,
+                    "workers": n,
+                    "shards": len(split_shards(html, enc.shards)),
+                    "encode_s": elapsed,
+                    "speedup": single_s / elapsed if elapsed > 0 else 0.0,
+                    "match": ids == reference,
+                })
+    return {"tokens": len(reference), "single_s": single_s, "rows": rows}
+
+
+def run_sharded(names: list[str], html: str, workers: list[int], backends: list[str]) -> dict:
+    results = {}
+    for name in names:
+        print(f"  Sharding {name}...", end=" ", flush=True)
+        try:
+            results[name] = shard_tokenizer(name, html, workers, backends)
+            print("done")
+        except Exception as e:
+            print(f"SKIPPED ({e})")
+    return {"chars": len(html), "cpus": os.cpu_count(), "results": results}
+
+
+def print_sharded(report: dict):
+    mismatched = []
+    for name, r in report["results"].items():
+        print()
+        print(f"{name}  ({r['tokens']:,} tokens, single-shot {r['single_s'] * 1000:.1f} ms)")
+        print("-" * 82)
+        print(f"{'Backend':<10} {'Workers':>8} {'Shards':>8} {'Encode ms':>10} {'Speedup':>8} {'Match':>6}")
+        print("-" * 82)
+        for row in r["rows"]:
+            print(
+                f"{row['backend']:<10} {row['workers']:>8} {row['shards']:>8}"
+                f" {row['encode_s'] * 1000:>10.1f} {row['speedup']:>7.2f}x"
+                f" {'yes' if row['match'] else 'NO':>6}"
+            )
+            if not row["match"]:
+                mismatched.append(f"{name} ({row['backend']} x{row['workers']})")
+        print("-" * 82)
+
+    print()
+    print(f"Speedup is single-shot encode time / sharded encode time ({report['cpus']} CPUs).")
+    if mismatched:
+        print("Ids differ from single-shot encoding: " + ", ".join(mismatched))
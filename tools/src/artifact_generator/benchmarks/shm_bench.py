@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+File vs shared-memory ring transport benchmark — no server needed.
+
+A producer streams the corpus in CHUNK_SIZE chunks, as ag-demo does, while a
+consumer process follows the stream:
+
+    file  inline write + flush per chunk; the consumer polls os.stat() and
+          re-reads the whole file whenever it grows (what a file watcher does)
+    shm   RingWriter publish per chunk; the consumer copies out new records
+          with RingReader.read()
+
+Per-chunk delivery latency is the time from the producer finishing a write to
+the consumer first holding those bytes (perf_counter_ns is CLOCK_MONOTONIC, so
+timestamps compare across processes). Also reports end-to-end throughput and
+how many bytes the consumer had to read to follow the stream.
+
+Usage: uv run --project python ag-shm-bench [--corpus NAME] [--size N] [--delay-ms 0] [--poll-ms 0] [--runs 3]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from artifact_generator.corpus import CHUNK_SIZE, add_corpus_arguments, corpus_from_args
+from artifact_generator.pipeline import InlineWriter
+from artifact_generator.shmring import RingReader, RingWriter
+
+TRANSPORTS = ("file", "shm")
+
+
+# ── consumers (run in a child process) ───────────────────────────────────────
+
+def _follow_file(path: str, total: int, poll_s: float, ready, conn):
+    times, sizes = [], []
+    read_bytes = 0
+    last = 0
+    data = b""
+    ready.set()
+    while last < total:
+        size = os.stat(path).st_size
+        if size == last:
+            time.sleep(poll_s)
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        times.append(time.perf_counter_ns())
+        read_bytes += len(data)
+        last = len(data)
+        sizes.append(last)
+    conn.send((times, sizes, read_bytes, data))
+
+
+def _follow_ring(name: str, total: int, poll_s: float, ready, conn):
+    times, sizes = [], []
+    parts = []
+    read_bytes = 0
+    with RingReader(name) as ring:
+        ready.set()
+        while read_bytes < total:
+            records = ring.read()
+            if not records:
+                time.sleep(poll_s)
+                continue
+            now = time.perf_counter_ns()
+            for _, payload in records:
+                parts.append(payload)
+                read_bytes += len(payload)
+            times.append(now)
+            sizes.append(read_bytes)
+    conn.send((times, sizes, read_bytes, b"".join(parts)))
+
+
+# ── producer ─────────────────────────────────────────────────────────────────
+
+def run_once(transport: str, chunks: list[str], total: int, delay_s: float, poll_s: float) -> dict:
+    """Stream `chunks` through one transport and return per-chunk latencies."""
+    ctx = mp.get_context("spawn")
+    ready = ctx.Event()
+    recv, send = ctx.Pipe(duplex=False)
+    tmpdir = tempfile.mkdtemp(prefix="ag-shm-bench-")
+    path = os.path.join(tmpdir, "artifact.html")
+    name = f"ag-bench-{os.getpid()}"
+
+    if transport == "file":
+        writer = InlineWriter(path)
+        consumer = ctx.Process(target=_follow_file, args=(path, total, poll_s, ready, send))
+    else:
+        writer = RingWriter(name)
+        consumer = ctx.Process(target=_follow_ring, args=(name, total, poll_s, ready, send))
+    consumer.start()
+    ready.wait()
+
+    published = np.empty(len(chunks), dtype=np.int64)
+    ends = np.empty(len(chunks), dtype=np.int64)
+    offset = 0
+    with writer:
+        t0 = time.perf_counter_ns()
+        for i, chunk in enumerate(chunks):
+            writer.write(chunk)
+            published[i] = time.perf_counter_ns()
+            offset += len(chunk.encode())
+            ends[i] = offset
+            if delay_s:
+                time.sleep(delay_s)
+        times, sizes, read_bytes, data = recv.recv()
+    consumer.join()
+    if os.path.exists(path):
+        os.remove(path)
+    os.rmdir(tmpdir)
+
+    times = np.asarray(times, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    # First observation whose cumulative size covers each chunk's end offset.
+    seen = times[np.searchsorted(sizes, ends)]
+    return {
+        "latency_ns": seen - published,
+        "elapsed_ns": int(times[-1] - t0),
+        "read_bytes": read_bytes,
+        "polls": len(times),
+        "data": data,
+    }
+
+
+def summarise(transport: str, runs: list[dict], total: int, expected: bytes) -> dict:
+    lat = np.concatenate([r["latency_ns"] for r in runs]) / 1000
+    elapsed = np.median([r["elapsed_ns"] for r in runs]) / 1e9
+    return {
+        "transport": transport,
+        "p50_us": float(np.percentile(lat, 50)),
+        "p95_us": float(np.percentile(lat, 95)),
+        "p99_us": float(np.percentile(lat, 99)),
+        "max_us": float(lat.max()),
+        "mbps": total / 1e6 / elapsed if elapsed > 0 else 0.0,
+        "read_x": np.mean([r["read_bytes"] for r in runs]) / total,
+        "polls": int(np.mean([r["polls"] for r in runs])),
+        "intact": all(r["data"] == expected for r in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare file and shared-memory ring transports")
+    add_corpus_arguments(parser)
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS),
+                        help="Transports to compare (default: both)")
+    parser.add_argument("--delay-ms", type=float, default=0.0,
+                        help="Producer delay between chunks in ms (default: 0)")
+    parser.add_argument("--poll-ms", type=float, default=0.0,
+                        help="Consumer sleep between empty polls in ms (default: 0)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per transport (default: 3)")
+    args = parser.parse_args()
+
+    html = corpus_from_args(args)
+    expected = html.encode()
+    total = len(expected)
+    chunks = [html[i : i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE)]
+
+    print(f"Corpus: {args.corpus}  ({total:,} bytes, {len(chunks):,} chunks of {CHUNK_SIZE} chars)")
+    print(f"Producer delay {args.delay_ms:g} ms, consumer poll {args.poll_ms:g} ms, {args.runs} runs")
+    print()
+
+    results = []
+    for transport in args.transport:
+        print(f"  Running {transport}...", end=" ", flush=True)
+        runs = [run_once(transport, chunks, total, args.delay_ms / 1000, args.poll_ms / 1000)
+                for _ in range(args.runs)]
+        results.append(summarise(transport, runs, total, expected))
+        print("done")
+
+    print()
+    print("-" * 82)
+    print(f"{'Transport':<10} {'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'Max µs':>10}"
+          f" {'MB/s':>9} {'Read x':>8} {'Polls':>7} {'OK':>4}")
+    print("-" * 82)
+    for r in results:
+        print(
+            f"{r['transport']:<10} {r['p50_us']:>9.1f} {r['p95_us']:>9.1f} {r['p99_us']:>9.1f}"
+            f" {r['max_us']:>10.1f} {r['mbps']:>9.2f} {r['read_x']:>8.1f} {r['polls']:>7,}"
+            f" {'yes' if r['intact'] else 'NO':>4}"
+        )
+    print("-" * 82)
+    print("Read x: bytes the consumer read per byte streamed (file polling re-reads the whole file).")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ HTML corpus generator for benchmarking — builds a large self-contained dashboa
 import random
 import string
 
+from artifact_generator.assets import load_dashboard
+
 CHUNK_SIZE = 30  # chars per flush
 
 # ── fake data generators ──────────────────────────────────────────────────────
@@ -27,38 +29,40 @@ PRODUCTS = [
 ORDER_ST = ["Shipped", "Processing", "Delivered", "Cancelled", "Refunded"]
 
 
-def rname():
-    return f"{random.choice(FIRST)} {random.choice(LAST)}"
+def rname(rng):
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)}"
 
 
-def remail(name):
-    return f"{name.lower().replace(' ', '.')}{random.randint(1, 99)}@example.com"
+def remail(rng, name):
+    return f"{name.lower().replace(' ', '.')}{rng.randint(1, 99)}@example.com"
 
 
-def rdate(y0=2020, y1=2025):
-    y = random.randint(y0, y1)
-    m = random.randint(1, 12)
-    d = random.randint(1, 28)
+def rdate(rng, y0=2020, y1=2025):
+    y = rng.randint(y0, y1)
+    m = rng.randint(1, 12)
+    d = rng.randint(1, 28)
     return f"{y}-{m:02d}-{d:02d}"
 
 
-def rid():
-    return "ORD-" + "".join(random.choices(string.digits, k=6))
+def rid(rng):
+    return "ORD-" + "".join(rng.choices(string.digits, k=6))
 
 
 # ── HTML builder ─────────────────────────────────────────────────────────────
 
 
-def build_html():
-    random.seed(42)
+def build_html(n_users=150, n_orders=100, seed=42):
+    # A private generator: the realtime server builds corpora on several
+    # threads at once, and callers' global random state is left alone.
+    rng = random.Random(seed)
 
     user_rows = []
-    for i in range(150):
-        name = rname()
-        email = remail(name)
-        role = random.choice(ROLES)
-        status = random.choice(STATUSES)
-        joined = rdate()
+    for i in range(n_users):
+        name = rname(rng)
+        email = remail(rng, name)
+        role = rng.choice(ROLES)
+        status = rng.choice(STATUSES)
+        joined = rdate(rng)
         color = {
             "Active": "#22c55e",
             "Inactive": "#94a3b8",
@@ -74,12 +78,12 @@ def build_html():
         )
 
     order_rows = []
-    for i in range(100):
-        oid = rid()
-        prod = random.choice(PRODUCTS)
-        amt = f"${random.uniform(9.99, 999.99):.2f}"
-        date = rdate(2024, 2025)
-        status = random.choice(ORDER_ST)
+    for i in range(n_orders):
+        oid = rid(rng)
+        prod = rng.choice(PRODUCTS)
+        amt = f"${rng.uniform(9.99, 999.99):.2f}"
+        date = rdate(rng, 2024, 2025)
+        status = rng.choice(ORDER_ST)
         color = {
             "Shipped": "#3b82f6",
             "Processing": "#f59e0b",
@@ -230,7 +234,7 @@ input:checked+.slider:before{{transform:translateX(20px)}}
     <div class="section">
       <div class="section-header">
         <span class="section-title">Users</span>
-        <span class="section-count">150 records</span>
+        <span class="section-count">{n_users} records</span>
       </div>
       <div class="table-wrap"><table>
         <thead><tr><th>#</th><th>Name</th><th>Email</th><th>Role</th><th>Status</th><th>Joined</th></tr></thead>
@@ -240,7 +244,7 @@ input:checked+.slider:before{{transform:translateX(20px)}}
     <div class="section">
       <div class="section-header">
         <span class="section-title">Recent Orders</span>
-        <span class="section-count">100 records</span>
+        <span class="section-count">{n_orders} records</span>
       </div>
       <div class="table-wrap"><table>
         <thead><tr><th>Order ID</th><th>Product</th><th>Amount</th><th>Date</th><th>Status</th></tr></thead>
@@ -294,3 +298,161 @@ input:checked+.slider:before{{transform:translateX(20px)}}
 </div>
 </body>
 </html>"""
+
+
+# ── corpus families ──────────────────────────────────────────────────────────
+#
+# Each family is a seeded generator producing one document shape at roughly
+# `size` characters, so tokenizer and render cost can be profiled per shape.
+# Generators take (size, rng) and must be deterministic for a given seed.
+
+DEFAULT_FAMILY = "dashboard"
+DEFAULT_SEED = 42
+
+FAMILIES = {}
+
+
+def register_family(name, default_size=65_000):
+    """Decorator registering `fn(size, rng) -> str` as a named corpus family."""
+    def wrap(fn):
+        FAMILIES[name] = (fn, default_size)
+        return fn
+    return wrap
+
+
+def _page(title, body, head=""):
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8">\n'
+        f"<title>{title}</title>\n{head}</head>\n<body>\n{body}\n</body>\n</html>"
+    )
+
+
+def _fill(size, rng, unit):
+    """Call `unit(i, rng)` until the joined parts reach `size` characters."""
+    parts, n, i = [], 0, 0
+    while n < size:
+        part = unit(i, rng)
+        parts.append(part)
+        n += len(part)
+        i += 1
+    return "".join(parts)
+
+
+@register_family("dashboard")
+def _dashboard(size, rng):
+    # ~11 KB of CSS/forms is fixed; rows fill the rest in the default 3:2 mix.
+    scale = max(size - 10_700, 0) / 54_300
+    return build_html(max(1, round(150 * scale)), max(1, round(100 * scale)), rng.randrange(2**32))
+
+
+NEST_DEPTH = 64
+
+
+@register_family("nested")
+def _nested(size, rng):
+    def unit(i, rng):
+        d = rng.randint(NEST_DEPTH // 2, NEST_DEPTH)
+        opens = "".join(f'<div class="n{k % 8}" data-d="{k}">' for k in range(d))
+        return f"{opens}<span>{rng.choice(FIRST)} {rng.choice(LAST)}</span>{'</div>' * d}\n"
+    return _page("Nested", _fill(size, rng, unit),
+                 "<style>div{margin-left:2px;border-left:1px solid #ddd}</style>\n")
+
+
+@register_family("table")
+def _table(size, rng):
+    def unit(i, rng):
+        cells = "".join(f"<td>{rng.randint(0, 10**6)}</td>" for _ in range(8))
+        return f'<tr><td>{i + 1}</td><td>{rng.choice(PRODUCTS)}</td>{cells}</tr>\n'
+    head = "".join(f"<th>c{k}</th>" for k in range(10))
+    body = f"<table>\n<thead><tr>{head}</tr></thead>\n<tbody>\n{_fill(size, rng, unit)}</tbody>\n</table>"
+    return _page("Table", body, "<style>td,th{padding:2px 6px;border:1px solid #ccc}</style>\n")
+
+
+@register_family("svg")
+def _svg(size, rng):
+    def unit(i, rng):
+        pts = " ".join(f"L{rng.uniform(0, 1000):.2f},{rng.uniform(0, 1000):.2f}" for _ in range(12))
+        color = f"#{rng.randrange(0x1000000):06x}"
+        return f'<path d="M{rng.uniform(0, 1000):.2f},{rng.uniform(0, 1000):.2f} {pts} Z" fill="{color}" fill-opacity="0.4"/>\n'
+    body = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1000 1000" width="800" height="800">\n{_fill(size, rng, unit)}</svg>'
+    return _page("SVG", body)
+
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at "
+    "which but have an they you were her she there been one all we their has would when "
+    "render stream token file watcher chrome browser document layout paint parse buffer"
+).split()
+
+
+@register_family("prose")
+def _prose(size, rng):
+    def unit(i, rng):
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 24))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        heading = f"<h2>Section {i // 6 + 1}</h2>\n" if i % 6 == 0 else ""
+        return f"{heading}<p>{' '.join(sentences)}</p>\n"
+    return _page("Prose", f"<article>\n{_fill(size, rng, unit)}</article>",
+                 "<style>article{max-width:40em;margin:auto;line-height:1.5}</style>\n")
+
+
+@register_family("styles")
+def _styles(size, rng):
+    props = ["color", "background", "border-color", "outline-color", "text-decoration-color"]
+
+    def unit(i, rng):
+        rules = ";".join(f"{rng.choice(props)}:#{rng.randrange(0x1000000):06x}" for _ in range(3))
+        return f'<style>.s{i}{{{rules};padding:{rng.randint(0, 12)}px}}</style><div class="s{i}">Block {i}</div>\n'
+    return _page("Styles", _fill(size, rng, unit))
+
+
+_UNICODE_SAMPLES = [
+    "Grüße aus München — naïve café façade",
+    "Съешь же ещё этих мягких французских булок",
+    "これは日本語のテキストです。東京、大阪、京都。",
+    "中文文本测试：渲染、流式传输、分词器。",
+    "한국어 텍스트 스트리밍 테스트입니다",
+    "مرحبا بالعالم — نص عربي من اليمين إلى اليسار",
+    "שלום עולם, טקסט בעברית",
+    "Ελληνικό κείμενο: αβγδε ζηθικ",
+    "हिन्दी पाठ का परीक्षण",
+    "Emoji ✅ 🚀 📄 🔥 👩‍💻 🇨🇦",
+]
+
+
+@register_family("unicode")
+def _unicode(size, rng):
+    def unit(i, rng):
+        text = " · ".join(rng.choice(_UNICODE_SAMPLES) for _ in range(rng.randint(2, 5)))
+        return f'<li lang="x-{i % 10}">{text}</li>\n'
+    return _page("Unicode", f"<ul>\n{_fill(size, rng, unit)}</ul>")
+
+
+def build_corpus(family=DEFAULT_FAMILY, size=None, seed=DEFAULT_SEED):
+    """Build a document from a registered family.
+
+    With no `size`, the dashboard family returns the pre-built asset unchanged
+    so existing benchmark numbers stay comparable.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"unknown corpus family {family!r} (choose from {', '.join(FAMILIES)})")
+    if family == DEFAULT_FAMILY and size is None:
+        return load_dashboard()
+    fn, default_size = FAMILIES[family]
+    return fn(size or default_size, random.Random(seed))
+
+
+def add_corpus_arguments(parser):
+    """Add --corpus/--size/--seed options to an argparse parser."""
+    parser.add_argument("--corpus", default=DEFAULT_FAMILY, choices=sorted(FAMILIES),
+                        help=f"Corpus family (default: {DEFAULT_FAMILY})")
+    parser.add_argument("--size", type=int, default=None,
+                        help="Approximate corpus size in chars (default: family default)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"Corpus seed (default: {DEFAULT_SEED})")
+
+
+def corpus_from_args(args):
+    return build_corpus(args.corpus, args.size, args.seed)
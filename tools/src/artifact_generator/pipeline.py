@@ -0,0 +1,261 @@
+"""
+Decoupled producer/writer pipeline — producers push chunks into a bounded
+queue that a dedicated writer thread drains, so a slow write or flush never
+stalls whoever is consuming the model or tokenizer stream.
+
+The writer coalesces everything pending (up to `max_batch` bytes/chars) into a
+single write + flush. When the queue is full the producer applies one of the
+backpressure policies:
+
+    block  wait for the writer to free a slot (default)
+    merge  never wait; fold the chunk into an overflow buffer that the writer
+           thread takes as one merged chunk as soon as the queue drains
+    error  raise queue.Full
+
+Writers given a Recorder record a `flush` event each time data actually
+reaches the file — from the writer thread for a pipeline — so traces show
+real flushes rather than enqueues.
+
+`open_writer()` returns a pipeline, a plain inline writer or a shared-memory
+ring writer (see shmring.py) with the same write()/close() interface, so
+scripts can switch with a flag.
+"""
+import queue
+import threading
+import time
+
+from artifact_generator.metrics import Registry
+from artifact_generator.shmring import RingWriter
+
+POLICIES = ("block", "merge", "error")
+DEFAULT_MAX_BATCH = 64 * 1024
+
+_STOP = object()
+
+
+class InlineWriter:
+    """Writes and flushes on the caller's thread — the original behaviour."""
+
+    def __init__(self, path: str, mode: str = "w", rec=None):
+        self._f = open(path, mode)
+        # A disabled recorder would still cost a call per chunk; keep None instead.
+        self._rec = rec if rec is not None and rec.enabled else None
+        self._unit = "bytes" if "b" in mode else "chars"
+        self._offset = 0
+        self.flushes = 0
+
+    def write(self, chunk):
+        self._f.write(chunk)
+        self._f.flush()
+        self.flushes += 1
+        if self._rec is not None:
+            self._rec.event("flush", offset=self._offset, **{self._unit: len(chunk)})
+        self._offset += len(chunk)
+
+    def close(self):
+        self._f.close()
+
+    def summary(self) -> dict:
+        return {"flushes": self.flushes}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WriterPipeline:
+    """Bounded queue of chunks drained by a writer thread."""
+
+    def __init__(self, path: str, maxsize: int = 1024, policy: str = "block",
+                 max_batch: int = DEFAULT_MAX_BATCH, mode: str = "w", rec=None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy!r} (choose from {', '.join(POLICIES)})")
+        self.policy = policy
+        self.max_batch = max_batch
+        self._empty = b"" if "b" in mode else ""
+        self._unit = "bytes" if "b" in mode else "chars"
+        self._rec = rec if rec is not None and rec.enabled else None
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        # Overflow is shared with the writer thread, which takes it once every
+        # older chunk has left the queue; the lock keeps that hand-over ordered.
+        self._overflow: list = []
+        self._lock = threading.Lock()
+        self._error: BaseException | None = None
+        self._f = open(path, mode)
+
+        self.metrics = Registry()
+        self.depth = self.metrics.gauge("ag_writer_queue_depth", "Chunks waiting for the writer thread")
+        self.depth_max = self.metrics.gauge("ag_writer_queue_depth_max", "High-water mark of queued chunks")
+        self.chunks = self.metrics.counter("ag_writer_chunks_total", "Chunks accepted from producers")
+        self.flushes = self.metrics.counter("ag_writer_flushes_total", "Coalesced write + flush calls")
+        self.written = self.metrics.counter("ag_writer_written_total", "Bytes (or chars) written")
+        self.merged = self.metrics.counter("ag_writer_overflow_merges_total", "Chunks folded into overflow (merge policy)")
+        self.blocked = self.metrics.counter("ag_writer_producer_blocked_seconds_total", "Time producers waited on a full queue")
+        self.write_latency = self.metrics.histogram("ag_writer_write_seconds", "Latency of one coalesced write + flush")
+
+        self._thread = threading.Thread(target=self._run, name="ag-writer", daemon=True)
+        self._thread.start()
+
+    # ── producer side ────────────────────────────────────────────────────────
+
+    def write(self, chunk):
+        if self._error is not None:
+            raise self._error
+        if self.policy == "merge":
+            self._merge(chunk)
+            self.chunks.inc()
+            return
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            if self.policy == "error":
+                raise
+            t0 = time.perf_counter()
+            self._queue.put(chunk)
+            self.blocked.inc(time.perf_counter() - t0)
+        self.chunks.inc()
+        self._note_depth()
+
+    def _merge(self, chunk):
+        with self._lock:
+            if not self._overflow:
+                try:
+                    self._queue.put_nowait(chunk)
+                    self._note_depth()
+                    return
+                except queue.Full:
+                    pass
+            # Once anything overflows, later chunks follow it so order holds.
+            self._overflow.append(chunk)
+            self.merged.inc()
+
+    def _note_depth(self):
+        depth = self._queue.qsize()
+        self.depth.set(depth)
+        if depth > self.depth_max.value:
+            self.depth_max.set(depth)
+
+    def close(self):
+        """Flush any overflow, drain the queue and stop the writer thread."""
+        with self._lock:
+            pending = self._empty.join(self._overflow) if self._overflow else None
+            self._overflow.clear()
+        if pending is not None:
+            self._queue.put(pending)
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._f.close()
+        if self._error is not None:
+            raise self._error
+
+    def summary(self) -> dict:
+        lat = self.write_latency
+        return {
+            "chunks": self.chunks.value,
+            "flushes": self.flushes.value,
+            "max_depth": self.depth_max.value,
+            "blocked_s": self.blocked.value,
+            "merges": self.merged.value,
+            "write_avg_ms": lat.sum / lat.count * 1000 if lat.count else 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── writer thread ────────────────────────────────────────────────────────
+
+    def _take_overflow(self):
+        """The overflow as one chunk once the queue is empty, else None."""
+        with self._lock:
+            if not self._overflow or not self._queue.empty():
+                return None
+            chunk = self._empty.join(self._overflow)
+            self._overflow.clear()
+            return chunk
+
+    def _run(self):
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        offset = 0
+        stop = False
+        while not stop:
+            # Overflow only grows while the queue is full, so when there is none
+            # to take here, get() cannot block with chunks left behind.
+            first = self._take_overflow()
+            batch = [get() if first is None else first]
+            if batch[0] is _STOP:
+                break
+            size = len(batch[0])
+            while size < self.max_batch:
+                try:
+                    chunk = get_nowait()
+                except queue.Empty:
+                    chunk = self._take_overflow()
+                    if chunk is None:
+                        break
+                if chunk is _STOP:
+                    stop = True
+                    break
+                batch.append(chunk)
+                size += len(chunk)
+            self.depth.set(self._queue.qsize())
+            if self._error is not None:
+                continue  # keep draining so producers never block forever
+            try:
+                t0 = time.perf_counter()
+                self._f.write(batch[0] if len(batch) == 1 else self._empty.join(batch))
+                self._f.flush()
+                self.write_latency.observe(time.perf_counter() - t0)
+            except BaseException as e:
+                self._error = e
+                continue
+            if self._rec is not None:
+                self._rec.event("flush", offset=offset, chunks=len(batch), **{self._unit: size})
+            offset += size
+            self.flushes.inc()
+            self.written.inc(size)
+
+
+def open_writer(path: str, queue_size: int = 0, policy: str = "block", mode: str = "w",
+                shm: str | None = None, rec=None):
+    """Return a RingWriter when `shm` names a ring (materialising `path` on
+    close), a WriterPipeline when `queue_size` > 0, else an InlineWriter.
+
+    File writers record their flushes on `rec` (a telemetry Recorder) if given.
+    """
+    if shm:
+        return RingWriter(shm, path=path)
+    if queue_size > 0:
+        return WriterPipeline(path, queue_size, policy, mode=mode, rec=rec)
+    return InlineWriter(path, mode, rec=rec)
+
+
+def add_pipeline_arguments(parser):
+    """Add --queue/--backpressure/--shm options to an argparse parser."""
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--queue", type=int, default=0, metavar="N",
+                           help="Write via a writer thread with an N-chunk queue (default: 0, inline writes)")
+    transport.add_argument("--shm", metavar="NAME", default=None,
+                           help="Publish chunks to a shared-memory ring instead; the file is written on close")
+    parser.add_argument("--backpressure", choices=POLICIES, default="block",
+                        help="Full-queue policy for --queue (default: block)")
+
+
+def print_summary(writer):
+    """Print pipeline statistics in the scripts' summary-table style."""
+    s = writer.summary()
+    if not s:
+        return
+    print(f"  Flushes       : {s['flushes']:>10,}")
+    if "chunks" not in s:
+        return
+    print(f"  Queued chunks : {s['chunks']:>10,}")
+    print(f"  Max depth     : {s['max_depth']:>10,}")
+    print(f"  Blocked       : {s['blocked_s']:>10.3f} s")
+    print(f"  Merges        : {s['merges']:>10,}")
+    print(f"  Write avg     : {s['write_avg_ms']:>10.3f} ms")
@@ -3,30 +3,45 @@
 Sanity / perf test — streams a large pre-built HTML dashboard to the watched
 file without any external dependencies.
 
-Usage: uv run --project python ag-demo [output-path]
+Usage: uv run --project python ag-demo [output-path] [--corpus NAME] [--size N] [--capture TRACE] [--queue N | --shm NAME]
 """
-import sys
+import argparse
 import time
 
-from artifact_generator.assets import load_dashboard
-from artifact_generator.corpus import CHUNK_SIZE
+from artifact_generator.corpus import CHUNK_SIZE, add_corpus_arguments, corpus_from_args
+from artifact_generator.pipeline import add_pipeline_arguments, open_writer, print_summary
+from artifact_generator.streamtrace import TraceCapture, add_capture_argument
+from artifact_generator.telemetry import Recorder
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/artifact.html"
+    parser = argparse.ArgumentParser(description="Stream a corpus to the watched file in fixed chunks")
+    parser.add_argument("path", nargs="?", default="/tmp/artifact.html", help="Output path")
+    add_corpus_arguments(parser)
+    add_capture_argument(parser)
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    path = args.path
+    capture = TraceCapture(args.capture)
 
-    html = load_dashboard()
+    rec = Recorder.from_env("ag-demo")
+
+    with rec.span("load_corpus", corpus=args.corpus):
+        html = corpus_from_args(args)
     total = len(html)
-    flushes = 0
+    chunks = 0
     t0 = time.perf_counter()
 
     print(f"Streaming {total:,} bytes to {path}  (chunk={CHUNK_SIZE} chars, no delay)")
 
-    with open(path, "w") as f:
+    writer = open_writer(path, args.queue, args.backpressure, shm=args.shm, rec=rec)
+
+    with rec.span("stream", path=path, chunk_size=CHUNK_SIZE), writer as f:
         for i in range(0, total, CHUNK_SIZE):
-            f.write(html[i : i + CHUNK_SIZE])
-            f.flush()
-            flushes += 1
+            chunk = html[i : i + CHUNK_SIZE]
+            capture.record(chunk)
+            f.write(chunk)
+            chunks += 1
 
     elapsed = time.perf_counter() - t0
     kb = total / 1024
@@ -36,9 +51,15 @@ def main():
     print(f"  Bytes written : {total:>10,}")
     print(f"  Elapsed       : {elapsed:>10.2f} s")
     print(f"  Throughput    : {kbps:>10.1f} KB/s")
-    print(f"  Flushes       : {flushes:>10,}")
+    print(f"  Chunks        : {chunks:>10,}")
+    print_summary(f)
     print(f"{'-'*44}")
 
+    if rec.export():
+        print(f"Trace written to {rec.path}")
+    if capture.save():
+        print(f"Stream trace written to {capture.path}")
+
 
 if __name__ == "__main__":
     main()
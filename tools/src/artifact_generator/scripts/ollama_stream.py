@@ -3,13 +3,17 @@
 Streams a large self-contained HTML dashboard from an ollama model to the
 watched file, token by token.
 
-Usage: uv run --project python ag-ollama [output-path] [model]
+Usage: uv run --project python ag-ollama [output-path] [model] [--capture TRACE] [--queue N | --shm NAME]
 """
-import sys
+import argparse
 import time
 
 import ollama
 
+from artifact_generator.pipeline import add_pipeline_arguments, open_writer, print_summary
+from artifact_generator.streamtrace import TraceCapture, add_capture_argument
+from artifact_generator.telemetry import Recorder
+
 
 PROMPT = """Create a large, self-contained HTML dashboard page with inline CSS only (no external resources).
 
@@ -31,26 +35,35 @@ Output raw HTML only. No markdown fences, no explanation."""
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/artifact.html"
-    model = sys.argv[2] if len(sys.argv) > 2 else "gemma3"
+    parser = argparse.ArgumentParser(description="Stream an ollama response to the watched file")
+    parser.add_argument("path", nargs="?", default="/tmp/artifact.html", help="Output path")
+    parser.add_argument("model", nargs="?", default="gemma3", help="ollama model (default: gemma3)")
+    add_capture_argument(parser)
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    path, model = args.path, args.model
+    capture = TraceCapture(args.capture)
+    rec = Recorder.from_env("ag-ollama")
 
     print(f"Model : {model}")
     print(f"Output: {path}")
     print("Streaming", end="", flush=True)
 
     bytes_written = 0
-    flushes = 0
+    chunks = 0
     t0 = time.perf_counter()
 
-    with open(path, "w") as f:
+    writer = open_writer(path, args.queue, args.backpressure, shm=args.shm, rec=rec)
+
+    with rec.span("stream", path=path, model=model), writer as f:
         for chunk in ollama.generate(model=model, prompt=PROMPT, stream=True):
             token = chunk.get("response", "")
             if token:
+                capture.record(token)
                 f.write(token)
-                f.flush()
                 bytes_written += len(token.encode())
-                flushes += 1
-                if flushes % 100 == 0:
+                chunks += 1
+                if chunks % 100 == 0:
                     print(".", end="", flush=True)
 
     elapsed = time.perf_counter() - t0
@@ -61,9 +74,15 @@ def main():
     print(f"  Bytes written : {bytes_written:>10,}")
     print(f"  Elapsed       : {elapsed:>10.2f} s")
     print(f"  Throughput    : {kbps:>10.1f} KB/s")
-    print(f"  Flushes       : {flushes:>10,}")
+    print(f"  Chunks        : {chunks:>10,}")
+    print_summary(f)
     print(f"{'-'*44}")
 
+    if rec.export():
+        print(f"Trace written to {rec.path}")
+    if capture.save():
+        print(f"Stream trace written to {capture.path}")
+
 
 if __name__ == "__main__":
     main()
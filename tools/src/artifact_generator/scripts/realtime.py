@@ -5,16 +5,110 @@ Realtime SSE viewer for token streaming.
 Opens a browser-viewable page that streams the dashboard HTML token-by-token
 using Server-Sent Events, rendering progressively in an iframe.
 
-Usage: uv run --project python ag-realtime [--port 8080] [--tokenizer gpt2] [--delay 20]
+Every token event carries its index as the SSE `id`, so a reconnecting
+EventSource resumes after `Last-Event-ID`; `?from=N` starts at token N
+explicitly. Tokenized streams are cached, so a resume only sends the tail.
+
+Server metrics are exposed in Prometheus text format at /metrics.
+
+Usage: uv run --project python ag-realtime [--port 8080] [--tokenizer gpt2] [--delay 20] [--corpus dashboard]
 """
 import argparse
 import json
+import threading
 import time
 import urllib.parse
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 from artifact_generator import make_tokenizer, HF_TOKENIZERS, TT_ENCODINGS
-from artifact_generator.assets import load_dashboard
+from artifact_generator.corpus import FAMILIES, add_corpus_arguments, build_corpus
+from artifact_generator.metrics import CONTENT_TYPE, Registry
+
+# ── metrics ──────────────────────────────────────────────────────────────────
+
+METRICS = Registry()
+ACTIVE_STREAMS = METRICS.gauge(
+    "ag_realtime_active_streams", "SSE streams currently being served")
+STREAMS = METRICS.counter(
+    "ag_realtime_streams_total", "SSE streams started", ("tokenizer",))
+TOKENS_SENT = METRICS.counter(
+    "ag_realtime_tokens_sent_total", "Token events written to clients", ("tokenizer",))
+BYTES_SENT = METRICS.counter(
+    "ag_realtime_bytes_sent_total", "SSE bytes written to clients", ("tokenizer",))
+EVENT_WRITE_SECONDS = METRICS.histogram(
+    "ag_realtime_event_write_seconds", "Write + flush latency per SSE event", ("tokenizer",))
+PACING_REQUESTED = METRICS.counter(
+    "ag_realtime_pacing_requested_seconds_total",
+    "Requested inter-token delay summed over sent events", ("tokenizer",))
+PACING_ACHIEVED = METRICS.counter(
+    "ag_realtime_pacing_achieved_seconds_total",
+    "Wall time spent streaming token events", ("tokenizer",))
+TOKENIZER_LOAD_SECONDS = METRICS.histogram(
+    "ag_realtime_tokenizer_load_seconds", "Tokenizer construction time", ("tokenizer",))
+TOKENIZER_ENCODE_SECONDS = METRICS.histogram(
+    "ag_realtime_tokenizer_encode_seconds", "Time to encode the corpus", ("tokenizer",))
+CLIENT_DISCONNECTS = METRICS.counter(
+    "ag_realtime_client_disconnects_total", "Streams ended early by the client")
+RESUMED_STREAMS = METRICS.counter(
+    "ag_realtime_streams_resumed_total", "Streams started past token 0 (Last-Event-ID or ?from=)", ("tokenizer",))
+TOKENS_SKIPPED = METRICS.counter(
+    "ag_realtime_tokens_skipped_total", "Tokens not re-sent thanks to resumption", ("tokenizer",))
+STREAM_CACHE = METRICS.counter(
+    "ag_realtime_stream_cache_total", "Tokenized stream lookups", ("result",))
+
+# Tokenizer names come from the query string; anything outside the known set
+# shares one series so clients cannot mint new label values.
+KNOWN_TOKENIZERS = frozenset(HF_TOKENIZERS + TT_ENCODINGS)
+
+
+def tokenizer_label(name: str) -> str:
+    return name if name in KNOWN_TOKENIZERS else "other"
+
+
+# ── tokenized stream cache ───────────────────────────────────────────────────
+
+STREAM_CACHE_SIZE = 8
+# Largest ?size= a client may request, in chars; larger values are clamped.
+MAX_QUERY_SIZE = 4_000_000
+
+_streams: OrderedDict = OrderedDict()
+_streams_lock = threading.Lock()
+
+
+def tokenized_stream(tok_name: str, corpus: str, size: int | None, seed: int):
+    """Return (decode, ids) for a stream, tokenizing it on first request.
+
+    Corpora are seeded, so an evicted entry re-tokenizes to the same ids and
+    resumed offsets stay valid. Raises whatever the tokenizer or corpus
+    builder raises.
+    """
+    key = (tok_name, corpus, size, seed)
+    label = tokenizer_label(tok_name)
+    with _streams_lock:
+        hit = _streams.get(key)
+        if hit is not None:
+            _streams.move_to_end(key)
+    if hit is not None:
+        STREAM_CACHE.labels("hit").inc()
+        return hit
+    STREAM_CACHE.labels("miss").inc()
+
+    t_load = time.perf_counter()
+    encode, decode = make_tokenizer(tok_name)
+    TOKENIZER_LOAD_SECONDS.labels(label).observe(time.perf_counter() - t_load)
+    html = build_corpus(corpus, size, seed)
+    t_enc = time.perf_counter()
+    ids = encode(html)
+    TOKENIZER_ENCODE_SECONDS.labels(label).observe(time.perf_counter() - t_enc)
+
+    entry = (decode, ids)
+    with _streams_lock:
+        _streams[key] = entry
+        while len(_streams) > STREAM_CACHE_SIZE:
+            _streams.popitem(last=False)
+    return entry
 
 VIEWER_HTML = """\
 <!DOCTYPE html>
@@ -43,15 +137,16 @@ VIEWER_HTML = """\
 <div class="toolbar">
   <label>Tokenizer
     <select id="tok">
-      <option>gpt2</option>
-      <option>bert-base-uncased</option>
-      <option>google/gemma-3-1b-it</option>
-      <option>o200k_base</option>
-      <option>cl100k_base</option>
+__TOKENIZER_OPTIONS__
+    </select>
+  </label>
+  <label>Corpus
+    <select id="corpus">
+__CORPUS_OPTIONS__
     </select>
   </label>
-  <label>Delay <span id="delayVal">20</span>ms
-    <input type="range" id="delay" min="0" max="100" value="20">
+  <label>Delay <span id="delayVal">__DELAY__</span>ms
+    <input type="range" id="delay" min="0" max="100" value="__DELAY__">
   </label>
   <button id="btn" onclick="toggle()">Start</button>
   <div class="stats">
@@ -82,9 +177,12 @@ function toggle() {
   frame.srcdoc = '';
   const tok = document.getElementById('tok').value;
   const d = delayInput.value;
-  es = new EventSource('/stream?tokenizer=' + encodeURIComponent(tok) + '&delay=' + d);
+  const corpus = document.getElementById('corpus').value;
+  es = new EventSource('/stream?tokenizer=' + encodeURIComponent(tok) + '&delay=' + d
+                       + '&corpus=' + encodeURIComponent(corpus));
   es.onmessage = e => {
     const msg = JSON.parse(e.data);
+    if (msg.index < tokens) return;  // already have it
     buf += msg.token;
     tokens = msg.index + 1;
     frame.srcdoc = buf;
@@ -93,7 +191,9 @@ function toggle() {
     updateStats();
     stop();
   });
-  es.onerror = () => stop();
+  // Server-sent error events carry data; transport errors leave the browser
+  // reconnecting with Last-Event-ID, and the server sends only the tail.
+  es.onerror = e => { if (e.data || es.readyState === EventSource.CLOSED) stop(); };
   btn.textContent = 'Stop';
   btn.className = 'stop';
   timer = setInterval(updateStats, 250);
@@ -112,6 +212,24 @@ function stop() {
 """
 
 
+def _options(names, selected: str) -> str:
+    return "\n".join(
+        f'      <option{" selected" if name == selected else ""}>{escape(name)}</option>'
+        for name in names
+    )
+
+
+def render_viewer(args) -> str:
+    """Viewer page with the server's defaults preselected."""
+    tokenizers = HF_TOKENIZERS + TT_ENCODINGS
+    if args.tokenizer not in tokenizers:
+        tokenizers = [args.tokenizer] + tokenizers
+    return (VIEWER_HTML
+            .replace("__TOKENIZER_OPTIONS__", _options(tokenizers, args.tokenizer))
+            .replace("__CORPUS_OPTIONS__", _options(FAMILIES, args.corpus))
+            .replace("__DELAY__", str(args.delay)))
+
+
 class Handler(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
@@ -119,21 +237,42 @@ class Handler(BaseHTTPRequestHandler):
             self._serve_viewer()
         elif parsed.path == "/stream":
             self._serve_stream(parsed.query)
+        elif parsed.path == "/metrics":
+            self._serve_metrics()
         else:
             self.send_error(404)
 
     def _serve_viewer(self):
-        body = VIEWER_HTML.encode()
+        body = render_viewer(self.server.corpus_args).encode()
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _serve_metrics(self):
+        body = METRICS.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def _serve_stream(self, query: str):
         params = urllib.parse.parse_qs(query)
-        tok_name = params.get("tokenizer", ["gpt2"])[0]
-        delay_ms = int(params.get("delay", ["20"])[0])
+        defaults = self.server.corpus_args
+        tok_name = params.get("tokenizer", [defaults.tokenizer])[0]
+        corpus = params.get("corpus", [defaults.corpus])[0]
+        last_id = self.headers.get("Last-Event-ID")
+        try:
+            delay_ms = max(int(params.get("delay", [defaults.delay])[0]), 0)
+            # Corpora are built per request and cached, so cap what a client can ask for.
+            size = min(max(int(params["size"][0]), 1), MAX_QUERY_SIZE) if "size" in params else defaults.size
+            seed = int(params.get("seed", [defaults.seed])[0])
+            start = int(last_id) + 1 if last_id else int(params.get("from", ["0"])[0])
+        except ValueError:
+            self.send_error(400, "delay, size, seed, from and Last-Event-ID must be integers")
+            return
         delay_s = delay_ms / 1000.0
 
         self.send_response(200)
@@ -143,39 +282,67 @@ class Handler(BaseHTTPRequestHandler):
         self.send_header("X-Accel-Buffering", "no")
         self.end_headers()
 
+        ACTIVE_STREAMS.inc()
+        STREAMS.labels(tokenizer_label(tok_name)).inc()
+        try:
+            self._stream_tokens(tok_name, delay_s, corpus, size, seed, start)
+        finally:
+            ACTIVE_STREAMS.dec()
+
+    def _stream_tokens(self, tok_name: str, delay_s: float, corpus: str, size: int | None, seed: int,
+                       start: int = 0):
         try:
-            encode, decode = make_tokenizer(tok_name)
+            decode, ids = tokenized_stream(tok_name, corpus, size, seed)
         except Exception as e:
             self._send_event("error", {"error": str(e)})
             return
-
-        html = load_dashboard()
-        ids = encode(html)
+        label = tokenizer_label(tok_name)
         total = len(ids)
+        start = min(max(start, 0), total)
+        if start:
+            RESUMED_STREAMS.labels(label).inc()
+            TOKENS_SKIPPED.labels(label).inc(start)
+
+        # Resolve labelled children once; the loop only touches their locks.
+        tokens_sent = TOKENS_SENT.labels(label)
+        bytes_sent = BYTES_SENT.labels(label)
+        write_latency = EVENT_WRITE_SECONDS.labels(label)
+        sent = 0
         t0 = time.perf_counter()
 
         try:
-            for i, token_id in enumerate(ids):
-                token_text = decode([token_id])
+            for i in range(start, total):
+                token_text = decode([ids[i]])
                 payload = json.dumps({"token": token_text, "index": i, "total": total})
-                self.wfile.write(f"data: {payload}\n\n".encode())
+                data = f"id: {i}\ndata: {payload}\n\n".encode()
+                w0 = time.perf_counter()
+                self.wfile.write(data)
                 self.wfile.flush()
+                write_latency.observe(time.perf_counter() - w0)
+                tokens_sent.inc()
+                bytes_sent.inc(len(data))
+                sent += 1
                 if delay_s > 0:
                     time.sleep(delay_s)
         except (BrokenPipeError, ConnectionResetError):
+            CLIENT_DISCONNECTS.inc()
             return
+        finally:
+            PACING_REQUESTED.labels(label).inc(delay_s * sent)
+            PACING_ACHIEVED.labels(label).inc(time.perf_counter() - t0)
 
         elapsed = time.perf_counter() - t0
         done_payload = json.dumps({
             "elapsed": round(elapsed, 3),
             "total_tokens": total,
+            "resumed_from": start,
             "tokenizer": tok_name,
         })
         try:
-            self.wfile.write(f"event: done\ndata: {done_payload}\n\n".encode())
+            self.wfile.write(f"event: done\nid: {total - 1}\ndata: {done_payload}\n\n".encode())
             self.wfile.flush()
         except (BrokenPipeError, ConnectionResetError):
-            pass
+            CLIENT_DISCONNECTS.inc()
 
     def _send_event(self, event: str, data: dict):
         try:
@@ -194,12 +361,17 @@ def main():
     parser.add_argument("--port", type=int, default=8080, help="HTTP port (default: 8080)")
     parser.add_argument("--tokenizer", default="gpt2", help="Default tokenizer (default: gpt2)")
     parser.add_argument("--delay", type=int, default=20, help="Default delay in ms (default: 20)")
+    add_corpus_arguments(parser)
     args = parser.parse_args()
 
-    server = HTTPServer(("", args.port), Handler)
+    server = ThreadingHTTPServer(("", args.port), Handler)
+    server.daemon_threads = True
+    server.corpus_args = args
     print(f"Realtime viewer running at http://localhost:{args.port}")
+    print(f"  Metrics:           http://localhost:{args.port}/metrics")
     print(f"  Default tokenizer: {args.tokenizer}")
     print(f"  Default delay:     {args.delay}ms")
+    print(f"  Default corpus:    {args.corpus}")
     print("Press Ctrl+C to stop.")
     try:
         server.serve_forever()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Replays a captured stream trace into the watched file, reproducing the exact
+chunking and inter-chunk timing (optionally time-scaled).
+
+Capture a trace from any writer with --capture, e.g.
+    uv run --project tools ag-ollama /tmp/artifact.html --capture /tmp/ollama.agt
+
+Usage: uv run --project python ag-replay TRACE [output-path] [--speed 1.0] [--queue N | --shm NAME]
+"""
+import argparse
+import time
+
+from artifact_generator.pipeline import add_pipeline_arguments, open_writer, print_summary
+from artifact_generator.streamtrace import StreamTrace
+from artifact_generator.telemetry import Recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a stream trace into a file")
+    parser.add_argument("trace", help="Stream trace captured with --capture")
+    parser.add_argument("path", nargs="?", default="/tmp/artifact.html", help="Output path")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Time scale: 2.0 replays twice as fast, 0 disables pacing (default: 1.0)")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+
+    trace = StreamTrace.load(args.trace)
+    rec = Recorder.from_env("ag-replay")
+    scale = 1.0 / args.speed if args.speed > 0 else 0.0
+
+    print(f"Replaying {len(trace):,} chunks / {len(trace.corpus):,} bytes to {args.path}"
+          f"  (captured {trace.duration_ns / 1e9:.2f} s, speed x{args.speed:g})")
+
+    chunks = 0
+    late_ns = 0
+    max_late_ns = 0
+    t0 = time.perf_counter_ns()
+
+    writer = open_writer(args.path, args.queue, args.backpressure, mode="wb", shm=args.shm, rec=rec)
+    with rec.span("replay", path=args.path, speed=args.speed), writer as f:
+        for t_ns, _, data in trace.payloads():
+            if scale:
+                due = t0 + int(t_ns * scale)
+                wait = due - time.perf_counter_ns()
+                if wait > 0:
+                    time.sleep(wait / 1e9)
+                late = time.perf_counter_ns() - due
+                late_ns += late
+                max_late_ns = max(max_late_ns, late)
+            f.write(data)
+            chunks += 1
+
+    elapsed = (time.perf_counter_ns() - t0) / 1e9
+    kb = len(trace.corpus) / 1024
+    kbps = kb / elapsed if elapsed > 0 else 0
+
+    print(f"\n{'-'*44}")
+    print(f"  Bytes written : {len(trace.corpus):>10,}")
+    print(f"  Elapsed       : {elapsed:>10.2f} s")
+    print(f"  Throughput    : {kbps:>10.1f} KB/s")
+    print(f"  Chunks        : {chunks:>10,}")
+    print_summary(f)
+    if scale and chunks:
+        print(f"  Mean lateness : {late_ns / chunks / 1e6:>10.3f} ms")
+        print(f"  Max lateness  : {max_late_ns / 1e6:>10.3f} ms")
+    print(f"{'-'*44}")
+
+    if rec.export():
+        print(f"Trace written to {rec.path}")
+
+
+if __name__ == "__main__":
+    main()
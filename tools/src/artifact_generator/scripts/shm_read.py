@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Reference reader for the shared-memory ring transport — attaches to a ring
+published by any writer run with --shm, reassembles the stream in sequence
+order and optionally mirrors it into a file.
+
+Start the reader first (it waits for the ring to appear), then the writer:
+    uv run --project tools ag-shm-read agstream /tmp/mirror.html &
+    uv run --project tools ag-demo /tmp/artifact.html --shm agstream
+
+Usage: uv run --project python ag-shm-read NAME [output-path] [--timeout 5.0] [--poll-ms 0]
+"""
+import argparse
+import time
+
+from artifact_generator.shmring import RingReader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a shared-memory ring stream")
+    parser.add_argument("name", help="Ring name passed to the writer's --shm")
+    parser.add_argument("path", nargs="?", default=None, help="Mirror the stream into this file")
+    parser.add_argument("--timeout", type=float, default=5.0,
+                        help="Seconds to wait for the ring to appear (default: 5.0)")
+    parser.add_argument("--poll-ms", type=float, default=0.0,
+                        help="Sleep between empty polls in ms (default: 0, spin with yield)")
+    args = parser.parse_args()
+
+    total = 0
+    records = 0
+    out = open(args.path, "wb") if args.path else None
+
+    with RingReader(args.name, timeout=args.timeout) as ring:
+        print(f"Attached to ring {args.name!r}  ({ring.capacity:,} bytes)")
+        t0 = time.perf_counter()
+        for payload in ring.chunks(args.poll_ms / 1000):
+            records += 1
+            total += len(payload)
+            if out is not None:
+                out.write(payload)
+                out.flush()
+        elapsed = time.perf_counter() - t0
+
+    if out is not None:
+        out.close()
+
+    kbps = total / 1024 / elapsed if elapsed > 0 else 0
+
+    print(f"\n{'-'*44}")
+    print(f"  Bytes read    : {total:>10,}")
+    print(f"  Records       : {records:>10,}")
+    print(f"  Elapsed       : {elapsed:>10.2f} s")
+    print(f"  Throughput    : {kbps:>10.1f} KB/s")
+    print(f"{'-'*44}")
+
+
+if __name__ == "__main__":
+    main()
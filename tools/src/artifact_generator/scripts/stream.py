@@ -2,27 +2,51 @@
 """
 Simple LLM streaming via ollama.
 
-Usage: uv run --project python ag-stream [output-path] [model]
+Usage: uv run --project python ag-stream [output-path] [model] [--capture TRACE] [--queue N | --shm NAME]
 """
-import sys
+import argparse
 
 import ollama
 
+from artifact_generator.pipeline import add_pipeline_arguments, open_writer, print_summary
+from artifact_generator.streamtrace import TraceCapture, add_capture_argument
+from artifact_generator.telemetry import Recorder
+
 
 PROMPT = """Create a self-contained HTML page with CSS animations.
 Output raw HTML only, no markdown fences."""
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else "/tmp/artifact.html"
-    model = sys.argv[2] if len(sys.argv) > 2 else "llama3.2"
+    parser = argparse.ArgumentParser(description="Stream an ollama response to the watched file")
+    parser.add_argument("path", nargs="?", default="/tmp/artifact.html", help="Output path")
+    parser.add_argument("model", nargs="?", default="llama3.2", help="ollama model (default: llama3.2)")
+    add_capture_argument(parser)
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    path, model = args.path, args.model
+    capture = TraceCapture(args.capture)
+
+    rec = Recorder.from_env("ag-stream")
+
+    chunks = 0
+    writer = open_writer(path, args.queue, args.backpressure, shm=args.shm, rec=rec)
 
-    with open(path, "w") as f:
+    with rec.span("stream", path=path, model=model), writer as f:
         for chunk in ollama.generate(model=model, prompt=PROMPT, stream=True):
             token = chunk.get("response", "")
             if token:
+                capture.record(token)
                 f.write(token)
-                f.flush()
+                chunks += 1
+
+    print(f"{'-'*44}")
+    print(f"  Chunks        : {chunks:>10,}")
+    print_summary(f)
+    print(f"{'-'*44}")
+
+    rec.export()
+    capture.save()
 
 
 if __name__ == "__main__":
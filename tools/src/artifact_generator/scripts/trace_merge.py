@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Merges Python writer traces with the Rust binary's spans into one timeline.
+
+Inputs are OTLP/JSON files written by the Python writers (AG_PY_TRACE_FILE)
+and the JSON-lines span log written by artifact-generator (AG_TRACE_FILE).
+Writes a combined OTLP/JSON document and prints the timeline.
+
+Usage: uv run --project tools ag-trace-merge TRACE [TRACE ...] [-o merged.json]
+"""
+import argparse
+import json
+
+from artifact_generator.telemetry import load_trace
+
+
+def _service(resource_spans: dict) -> str:
+    for attr in resource_spans.get("resource", {}).get("attributes", []):
+        if attr["key"] == "service.name":
+            return attr["value"].get("stringValue", "")
+    return "?"
+
+
+def timeline(resource_spans: list[dict]) -> list[tuple]:
+    """Flatten spans to (start_ns, end_ns, service, name, n_events) rows."""
+    rows = []
+    for rs in resource_spans:
+        service = _service(rs)
+        for scope in rs.get("scopeSpans", []):
+            for span in scope.get("spans", []):
+                start = int(span["startTimeUnixNano"])
+                end = int(span["endTimeUnixNano"])
+                rows.append((start, end, service, span["name"], len(span.get("events", []))))
+    rows.sort()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge Python and Rust traces into one timeline")
+    parser.add_argument("traces", nargs="+", help="OTLP/JSON or Rust JSON-lines trace files")
+    parser.add_argument("-o", "--output", default="/tmp/artifact-trace.json",
+                        help="Merged OTLP/JSON output (default: /tmp/artifact-trace.json)")
+    args = parser.parse_args()
+
+    merged = []
+    for path in args.traces:
+        merged.extend(load_trace(path))
+
+    with open(args.output, "w") as f:
+        json.dump({"resourceSpans": merged}, f)
+
+    rows = timeline(merged)
+    if not rows:
+        print("No spans found.")
+        return
+
+    t0 = rows[0][0]
+    print("-" * 82)
+    print(f"{'Start ms':>10} {'Dur ms':>10}  {'Service':<22} {'Span':<26} {'Events':>8}")
+    print("-" * 82)
+    for start, end, service, name, n_events in rows:
+        print(
+            f"{(start - t0) / 1e6:>10.1f} {(end - start) / 1e6:>10.1f}"
+            f"  {service:<22} {name:<26} {n_events:>8,}"
+        )
+    print("-" * 82)
+    print(f"Merged trace written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Watcher probe — observes a file while any writer streams into it and compares
+how an inotify watcher and mtime pollers (the Rust watcher compares
+`metadata().modified()` every 100 ms) see the stream.
+
+Each write is matched to the first detection at or after it:
+
+    latency    detection time - write time
+    merged     writes picked up by a detection that already covered an
+               earlier write (one reload for several writes)
+    missed     writes no detection ever covered — the mtime did not change
+               again before the stream went idle
+    unmatched  detections that covered no write (e.g. the truncate on open)
+
+Writes come from inotify IN_MODIFY events by default; the kernel folds
+identical unread events together, so a fast writer is undercounted. Pass the
+writer's AG_PY_TRACE_FILE output as --writer-trace to use its flush events
+instead, which also gives inotify a latency of its own. All times are raw
+`time.monotonic_ns()` — the writer's come from its events' `monotonic_ns`
+attribute — since the clock is shared by every process on the host while the
+traces' wall-anchored timestamps are offset per process. Run the probe first:
+
+    uv run --project tools ag-watch-probe /tmp/artifact.html --interval-ms 100 10 &
+    AG_PY_TRACE_FILE=/tmp/writer.json uv run --project tools ag-demo /tmp/artifact.html
+
+Usage: uv run --project python ag-watch-probe PATH [--interval-ms 100 ...] [--mtime-resolution-ms N]
+       [--idle 2.0] [--writer-trace FILE] [--json PATH]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from artifact_generator.telemetry import load_trace
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """Watches the directory holding `path` via libc inotify (Linux only)."""
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory.decode()}")
+        self.name = os.path.basename(path).encode()
+
+    def read(self, timeout: float) -> list[int]:
+        """Wait up to `timeout` s; return the masks of events for our file."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        buf = os.read(self.fd, 64 * 1024)
+        masks = []
+        i = 0
+        while i < len(buf):
+            _, mask, _, length = _EVENT.unpack_from(buf, i)
+            i += _EVENT.size
+            name = buf[i : i + length].rstrip(b"\0")
+            i += length
+            if name == self.name:
+                masks.append(mask)
+        return masks
+
+    def close(self):
+        os.close(self.fd)
+
+
+def watch_inotify(ino: Inotify, stop: threading.Event, writes: list, detections: list, last_event: list):
+    """Record each IN_MODIFY as a write and each read() batch as one detection."""
+    while not stop.is_set():
+        masks = ino.read(0.05)
+        if not masks:
+            continue
+        t = time.monotonic_ns()
+        detections.append(t)
+        writes.extend(t for m in masks if m & IN_MODIFY)
+        last_event[0] = t
+
+
+def _mtime(path: str, resolution_ns: int):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return mtime - mtime % resolution_ns if resolution_ns else mtime
+
+
+def watch_mtime(path: str, interval_s: float, resolution_ns: int, stop: threading.Event, detections: list):
+    """Fixed-rate mtime poller, like the Rust watcher's interval loop."""
+    last = _mtime(path, resolution_ns)
+    next_tick = time.monotonic()
+    while not stop.is_set():
+        next_tick += interval_s
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        mtime = _mtime(path, resolution_ns)
+        if mtime != last:
+            last = mtime
+            detections.append(time.monotonic_ns())
+
+
+def flush_times(path: str) -> list[int]:
+    """Raw monotonic timestamps of every `flush` event in a writer's OTLP trace."""
+    times = []
+    for rs in load_trace(path):
+        for scope in rs.get("scopeSpans", []):
+            for span in scope.get("spans", []):
+                for ev in span.get("events", []):
+                    if ev["name"] != "flush":
+                        continue
+                    attrs = {a["key"]: a["value"] for a in ev.get("attributes", [])}
+                    if "monotonic_ns" not in attrs:
+                        raise ValueError(f"{path}: flush events carry no monotonic_ns; re-record the trace")
+                    times.append(int(attrs["monotonic_ns"]["intValue"]))
+    return sorted(times)
+
+
+def match(writes: np.ndarray, detections: np.ndarray) -> dict:
+    """Match every write to the first detection at or after it."""
+    idx = np.searchsorted(detections, writes)
+    seen = idx < len(detections)
+    latency_ms = (detections[idx[seen]] - writes[seen]) / 1e6
+    used = np.unique(idx[seen])
+    stats = {
+        "detections": len(detections),
+        "detected": int(seen.sum()),
+        "merged": int(seen.sum() - len(used)),
+        "missed": int((~seen).sum()),
+        "unmatched": len(detections) - len(used),
+    }
+    for p in (50, 95, 99):
+        stats[f"p{p}_ms"] = float(np.percentile(latency_ms, p)) if len(latency_ms) else None
+    stats["max_ms"] = float(latency_ms.max()) if len(latency_ms) else None
+    return stats
+
+
+def _fmt_ms(v) -> str:
+    return f"{v:>8.2f}" if v is not None else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inotify and mtime polling on a live stream")
+    parser.add_argument("path", help="File the writer streams into")
+    parser.add_argument("--interval-ms", type=float, nargs="+", default=[100.0],
+                        help="mtime poll intervals to run side by side (default: 100)")
+    parser.add_argument("--mtime-resolution-ms", type=float, default=0.0,
+                        help="Truncate mtimes to this granularity, emulating coarser filesystems "
+                             "(default: 0, the filesystem's own)")
+    parser.add_argument("--idle", type=float, default=2.0,
+                        help="Stop after this many seconds without file events (default: 2.0)")
+    parser.add_argument("--writer-trace", metavar="FILE",
+                        help="Writer's AG_PY_TRACE_FILE output; its flush events become the writes")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        parser.error("the inotify watcher requires Linux")
+
+    ino = Inotify(args.path)
+    stop = threading.Event()
+    resolution_ns = int(args.mtime_resolution_ms * 1e6)
+    ino_writes: list[int] = []
+    ino_detections: list[int] = []
+    last_event = [0]
+    watchers = {"inotify": ino_detections}
+    threads = [threading.Thread(target=watch_inotify,
+                                args=(ino, stop, ino_writes, ino_detections, last_event), daemon=True)]
+    for interval in args.interval_ms:
+        detections: list[int] = []
+        watchers[f"poll {interval:g} ms"] = detections
+        threads.append(threading.Thread(
+            target=watch_mtime, args=(args.path, interval / 1000, resolution_ns, stop, detections), daemon=True))
+
+    print(f"Watching {args.path}  (polls: {', '.join(f'{i:g} ms' for i in args.interval_ms)}, "
+          f"mtime resolution: {f'{args.mtime_resolution_ms:g} ms' if resolution_ns else 'native'})")
+    print("Start the writer now; stopping after", f"{args.idle:g} s idle (Ctrl-C to stop early).")
+    for t in threads:
+        t.start()
+    try:
+        while not last_event[0] or time.monotonic_ns() - last_event[0] < args.idle * 1e9:
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    for t in threads:
+        t.join()
+    ino.close()
+
+    if args.writer_trace:
+        try:
+            writes = flush_times(args.writer_trace)
+        except ValueError as e:
+            parser.error(str(e))
+        source = f"flush events in {args.writer_trace}"
+    else:
+        writes = sorted(ino_writes)
+        source = "inotify IN_MODIFY events"
+        watchers.pop("inotify")
+    if not writes:
+        print("No writes observed.")
+        return
+    w = np.asarray(writes, dtype=np.int64)
+    results = {name: match(w, np.asarray(d, dtype=np.int64)) for name, d in watchers.items()}
+
+    print()
+    print(f"Writes: {len(writes):,} over {(w[-1] - w[0]) / 1e9:.2f} s  (from {source})")
+    print("-" * 82)
+    print(f"{'Watcher':<16} {'Detect':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Max ms':>8}"
+          f" {'Merged':>7} {'Missed':>7} {'Unmatch':>8}")
+    print("-" * 82)
+    for name, r in results.items():
+        print(
+            f"{name:<16} {r['detections']:>7,} {_fmt_ms(r['p50_ms'])} {_fmt_ms(r['p95_ms'])}"
+            f" {_fmt_ms(r['p99_ms'])} {_fmt_ms(r['max_ms'])} {r['merged']:>7,} {r['missed']:>7,}"
+            f" {r['unmatched']:>8,}"
+        )
+    print("-" * 82)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"writes": len(writes), "source": source,
+                       "mtime_resolution_ms": args.mtime_resolution_ms, "watchers": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
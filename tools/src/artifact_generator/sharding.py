@@ -0,0 +1,128 @@
+"""
+Sharded parallel tokenization for large documents.
+
+The document is cut into shards at boundaries no tokenizer merges across, each
+shard is encoded without special tokens on a thread or process pool, and the
+ids are concatenated and wrapped in the tokenizer's own special tokens.
+
+Safe boundaries are a tag's "<" when it directly follows a letter or digit
+("Alice</td>") or a newline that itself follows a non-space character
+("</tr>\\n<tr>"): the regex pre-tokenizers of byte-level BPE (tiktoken, GPT-2)
+always end a pre-token there and never merge across pre-tokens, and
+whitespace/punctuation splitters (BERT) split there anyway. A newline inside
+a whitespace run ("\\n\\n<", "x  \\n<") is not safe: those patterns match the
+run as a whole (or all but its last character), so the split moves once the
+run is cut. Nor is cutting between ">" and "<" — "><" is one pre-token.
+Tokenizers without such a pre-tokenizer may still tokenize across the cut, so
+callers should check the result against single-shot encoding —
+`ag-bench --sharded` does. A document without boundaries (e.g.
+minified HTML) simply yields fewer shards.
+
+Backends:
+
+    thread   ThreadPoolExecutor; tiktoken's encode and HF's encode_batch
+             release the GIL, so shards run in parallel in one process
+    process  ProcessPoolExecutor; each worker loads the tokenizer once
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import tiktoken
+from tokenizers import Tokenizer
+
+from artifact_generator import TT_ENCODINGS
+
+BACKENDS = ("thread", "process")
+SHARDS_PER_WORKER = 4
+
+_BOUNDARY_RE = re.compile(r"(?:(?<=\S)\n|(?<=[^\W_]))(?=<)")
+
+
+def split_shards(text: str, n: int) -> list[str]:
+    """Split `text` into at most `n` shards of similar size at safe boundaries."""
+    if n <= 1 or not text:
+        return [text]
+    step = len(text) / n
+    cuts = [0]
+    for k in range(1, n):
+        m = _BOUNDARY_RE.search(text, max(int(k * step), cuts[-1] + 1))
+        if m is None:
+            break
+        cuts.append(m.end())
+    cuts.append(len(text))
+    return [text[a:b] for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def make_bare_encoder(name: str):
+    """Return (encode_fn, prefix, suffix).
+
+    encode_fn(text) -> ids without special tokens; `prefix` and `suffix` are
+    the special-token ids the tokenizer adds around a whole document.
+    """
+    if name in TT_ENCODINGS:
+        return tiktoken.get_encoding(name).encode, [], []
+
+    tok = Tokenizer.from_pretrained(name)
+
+    def encode(text):
+        # encode_batch releases the GIL while encoding, so threads overlap.
+        return tok.encode_batch([text], add_special_tokens=False)[0].ids
+
+    probe = "a"
+    bare = tok.encode(probe, add_special_tokens=False).ids
+    full = tok.encode(probe).ids
+    for i in range(len(full) - len(bare) + 1):
+        if full[i : i + len(bare)] == bare:
+            return encode, full[:i], full[i + len(bare):]
+    raise ValueError(f"cannot locate special tokens added by {name}")
+
+
+_worker_encode = None
+
+
+def _init_worker(name: str):
+    global _worker_encode
+    _worker_encode = make_bare_encoder(name)[0]
+
+
+def _encode_in_worker(shard: str) -> list[int]:
+    return _worker_encode(shard)
+
+
+class ShardedEncoder:
+    """Encodes documents shard-by-shard on a pool of `workers`."""
+
+    def __init__(self, name: str, workers: int = 1, backend: str = "thread", shards: int | None = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r} (choose from {', '.join(BACKENDS)})")
+        self.name = name
+        self.workers = workers
+        self.backend = backend
+        self.shards = shards or workers * SHARDS_PER_WORKER
+        self._encode, self._prefix, self._suffix = make_bare_encoder(name)
+        if backend == "process":
+            self._pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(name,))
+            self._fn = _encode_in_worker
+        else:
+            self._pool = ThreadPoolExecutor(workers)
+            self._fn = self._encode
+
+    def encode(self, text: str) -> list[int]:
+        parts = split_shards(text, self.shards)
+        ids = list(self._prefix)
+        if len(parts) == 1:
+            ids.extend(self._encode(parts[0]))
+        else:
+            for shard_ids in self._pool.map(self._fn, parts):
+                ids.extend(shard_ids)
+        ids.extend(self._suffix)
+        return ids
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,297 @@
+"""
+Shared-memory ring buffer transport for same-host consumers.
+
+A writer publishes chunks into a `multiprocessing.shared_memory` segment as
+sequence-numbered records; readers poll the published write position and copy
+out whatever is new — no write syscall per flush and no full re-read per poll.
+
+Segment layout (header counters are aligned native-endian u64 words, records
+little-endian):
+
+    0   magic b"AGRB", version u32
+    8   capacity u64         size of the data region
+    16  write_pos u64        total record bytes published (monotonic)
+    24  read_pos u64         total record bytes consumed by the reader
+    32  next_seq u64         sequence number of the next record
+    40  closed u8            writer finished
+    41  reader_attached u8
+    48  writer_pid u64
+    56  reserve_pos u64      end of the record being copied in
+    64  data[capacity]       records: seq u64, length u32, payload, wrapping
+
+The writer fills in the header before the magic, so a reader that sees the
+magic sees a valid capacity. It bumps `reserve_pos` before copying a record
+and `write_pos` only after, so readers never see partial records and can tell,
+after copying a block out, whether the writer has since reached into it.
+Counters go through a `Q`-typed memoryview so each load/store is one aligned
+8-byte access — `struct.pack_into` copies byte by byte and a reader could
+observe a torn position.
+
+A writer refuses a name already held by a ring whose writer is still running
+(`FileExistsError`); segments left behind by a writer that exited are reused.
+
+While a reader is attached the writer waits rather than overwrite unread
+bytes; with no reader it overwrites freely. A reader that stops consuming for
+`reader_timeout` seconds (e.g. one that was killed) is treated as detached so
+the writer cannot hang. A reader attaching after the ring has wrapped starts
+at the live tail, and one that falls behind gets `RingOverrun`.
+"""
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+MAGIC = b"AGRB"
+VERSION = 2
+HEADER_SIZE = 64
+DEFAULT_CAPACITY = 4 * 1024 * 1024
+
+_PREAMBLE = struct.Struct("<4sIQ")
+_RECORD = struct.Struct("<QI")
+
+_WRITE_POS, _READ_POS, _NEXT_SEQ, _CLOSED, _ATTACHED = 16, 24, 32, 40, 41
+_WRITER_PID, _RESERVE_POS = 48, 56
+
+
+class RingOverrun(RuntimeError):
+    """The writer overwrote records before the reader consumed them."""
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return True  # unknown owner: assume it is live
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _remove_stale(name: str):
+    """Unlink a ring left under `name` by a writer that has exited.
+
+    Raises FileExistsError if the segment is not a ring or its writer may still
+    be running — unlinking it would silently take over that writer's readers.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    stale = False
+    if shm.size >= HEADER_SIZE and bytes(shm.buf[:4]) == MAGIC:
+        pid = struct.unpack_from("=Q", shm.buf, _WRITER_PID)[0]
+        stale = bool(shm.buf[_CLOSED]) or not _pid_alive(pid)
+    if not stale:
+        # Attaching registered the segment with the resource tracker; it is not ours.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        shm.close()
+        raise FileExistsError(f"shared memory {name!r} is in use (remove /dev/shm/{name} if it is stale)")
+    shm.close()
+    shm.unlink()
+
+
+class _Ring:
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.buf = shm.buf
+        self.capacity = capacity
+        self._words = shm.buf[:HEADER_SIZE].cast("Q")
+
+    def _load(self, offset: int) -> int:
+        return self._words[offset // 8]
+
+    def _store(self, offset: int, value: int):
+        self._words[offset // 8] = value
+
+    def _release(self):
+        self._words.release()
+        self._words = None
+        self.buf = None
+        self.shm.close()
+
+    def _put(self, pos: int, data: bytes):
+        off = pos % self.capacity
+        first = min(len(data), self.capacity - off)
+        start = HEADER_SIZE + off
+        self.buf[start : start + first] = data[:first]
+        if first < len(data):
+            rest = len(data) - first
+            self.buf[HEADER_SIZE : HEADER_SIZE + rest] = data[first:]
+
+    def _get(self, pos: int, n: int) -> bytes:
+        off = pos % self.capacity
+        first = min(n, self.capacity - off)
+        start = HEADER_SIZE + off
+        data = bytes(self.buf[start : start + first])
+        if first < n:
+            data += bytes(self.buf[HEADER_SIZE : HEADER_SIZE + n - first])
+        return data
+
+
+class RingWriter(_Ring):
+    """Publishes chunks into a named ring. Optionally materialises `path` on close."""
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY, path: str | None = None,
+                 reader_timeout: float = 5.0):
+        _remove_stale(name)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity)
+        # close() unlinks explicitly. Dropping the tracker entry keeps readers in
+        # child processes, which share this tracker and unregister on attach,
+        # from tripping over it.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        super().__init__(shm, capacity)
+        self.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _PREAMBLE.pack_into(self.buf, 0, bytes(4), VERSION, capacity)
+        self._store(_WRITER_PID, os.getpid())
+        # Readers wait for the magic, so it goes in last.
+        self.buf[:4] = MAGIC
+        self.path = path
+        self.reader_timeout = reader_timeout
+        self._parts: list[bytes] = []
+        self._pos = 0
+        self._seq = 0
+
+    def write(self, chunk):
+        data = chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+        need = _RECORD.size + len(data)
+        if need > self.capacity:
+            raise ValueError(f"chunk of {len(data)} bytes does not fit a {self.capacity}-byte ring")
+        if self.buf[_ATTACHED]:
+            self._wait_for_reader(need)
+        self._store(_RESERVE_POS, self._pos + need)
+        self._put(self._pos, _RECORD.pack(self._seq, len(data)) + data)
+        self._pos += need
+        self._seq += 1
+        self._store(_NEXT_SEQ, self._seq)
+        self._store(_WRITE_POS, self._pos)
+        if self.path is not None:
+            self._parts.append(data)
+
+    def _wait_for_reader(self, need: int):
+        """Wait until the attached reader has consumed enough to fit `need` bytes.
+
+        The deadline restarts whenever the reader makes progress; a reader idle
+        for `reader_timeout` s is detached and later gets RingOverrun.
+        """
+        read_pos = self._load(_READ_POS)
+        deadline = time.monotonic() + self.reader_timeout
+        while self._pos + need - read_pos > self.capacity and self.buf[_ATTACHED]:
+            time.sleep(0)
+            pos = self._load(_READ_POS)
+            if pos != read_pos:
+                read_pos = pos
+                deadline = time.monotonic() + self.reader_timeout
+            elif time.monotonic() > deadline:
+                self.buf[_ATTACHED] = 0
+                return
+
+    def close(self):
+        """Mark the stream finished, write `path` if set and release the segment."""
+        self.buf[_CLOSED] = 1
+        if self.path is not None:
+            with open(self.path, "wb") as f:
+                f.write(b"".join(self._parts))
+        self._release()
+        resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+    def summary(self) -> dict:
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RingReader(_Ring):
+    """Reference reader: attaches to a named ring and yields records in order."""
+
+    def __init__(self, name: str, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        shm = None
+        while True:
+            try:
+                if shm is None:
+                    shm = shared_memory.SharedMemory(name=name)
+                    # Attaching registers the segment with this process's resource
+                    # tracker, which would unlink it at exit; the writer owns it.
+                    resource_tracker.unregister(shm._name, "shared_memory")
+                magic, version, capacity = _PREAMBLE.unpack_from(shm.buf, 0)
+                if magic != bytes(4):
+                    break
+            except FileNotFoundError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"no ring named {name!r} appeared within {timeout} s")
+            time.sleep(0.001)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"shared memory {name!r} is not an artifact-generator ring")
+        super().__init__(shm, capacity)
+        published = self._load(_WRITE_POS)
+        self._pos = published if published > capacity else 0
+        self._seq = None
+        # Publish where we start before attaching: the writer compares against
+        # read_pos as soon as it sees the flag.
+        self._store(_READ_POS, self._pos)
+        self.buf[_ATTACHED] = 1
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.buf[_CLOSED])
+
+    def read(self) -> list[tuple[int, bytes]]:
+        """Return every (seq, payload) published since the last call."""
+        end = self._load(_WRITE_POS)
+        if end - self._pos > self.capacity:
+            raise RingOverrun(f"reader at byte {self._pos} fell behind writer at {end}")
+        if end == self._pos:
+            return []
+        # One copy of everything new, then parse records out of local memory.
+        block = self._get(self._pos, end - self._pos)
+        # A detached reader is not waited for, so the writer may have started
+        # overwriting the block while it was copied; then its bytes are garbage.
+        reserved = self._load(_RESERVE_POS)
+        if reserved - self._pos > self.capacity:
+            raise RingOverrun(f"writer at byte {reserved} overwrote the block at {self._pos} during the copy")
+        out = []
+        i = 0
+        expected = self._seq
+        while i < len(block):
+            seq, length = _RECORD.unpack_from(block, i)
+            if expected is not None and seq != expected:
+                raise RingOverrun(f"expected record {expected}, found {seq}")
+            i += _RECORD.size
+            out.append((seq, block[i : i + length]))
+            i += length
+            expected = seq + 1
+        self._seq = expected
+        self._pos = end
+        self._store(_READ_POS, end)
+        return out
+
+    def chunks(self, poll_interval: float = 0.0):
+        """Yield payloads until the writer closes and the ring is drained."""
+        while True:
+            closed = self.closed
+            records = self.read()
+            for _, payload in records:
+                yield payload
+            if closed and not records:
+                return
+            if not records:
+                time.sleep(poll_interval)
+
+    def close(self):
+        self.buf[_ATTACHED] = 0
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
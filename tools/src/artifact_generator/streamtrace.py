@@ -0,0 +1,103 @@
+"""
+Compact binary trace of a timed stream, for capture and exact replay.
+
+Layout (little-endian):
+
+    header   magic b"AGTR", version u16, flags u16, n_chunks u32, corpus_len u64
+    corpus   corpus_len bytes of UTF-8 — the stored content chunks point into
+    chunks   n_chunks x (t_ns u64, offset u32, length u32)
+
+`t_ns` is the chunk's write time relative to the first chunk, `offset` and
+`length` locate its bytes in the corpus. Captured streams store the written
+text as the corpus, so offsets are simply cumulative.
+"""
+import struct
+import time
+
+MAGIC = b"AGTR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIQ")
+_CHUNK = struct.Struct("<QII")
+
+
+class StreamTrace:
+    """Chunk timings plus the corpus their byte ranges point into."""
+
+    def __init__(self, corpus: bytes, chunks: list[tuple[int, int, int]]):
+        self.corpus = corpus
+        self.chunks = chunks
+
+    def __len__(self):
+        return len(self.chunks)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.chunks[-1][0] if self.chunks else 0
+
+    def payloads(self):
+        """Yield (t_ns, offset, chunk_bytes) in stream order."""
+        view = memoryview(self.corpus)
+        for t_ns, offset, length in self.chunks:
+            yield t_ns, offset, view[offset : offset + length]
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, len(self.chunks), len(self.corpus)))
+            f.write(self.corpus)
+            f.write(b"".join(_CHUNK.pack(*c) for c in self.chunks))
+
+    @classmethod
+    def load(cls, path: str) -> "StreamTrace":
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, _flags, n_chunks, corpus_len = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a stream trace (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported trace version {version}")
+        start = _HEADER.size
+        corpus = data[start : start + corpus_len]
+        table = data[start + corpus_len :]
+        if len(table) != n_chunks * _CHUNK.size:
+            raise ValueError(f"{path} is truncated ({len(table)} chunk bytes, expected {n_chunks * _CHUNK.size})")
+        return cls(corpus, list(_CHUNK.iter_unpack(table)))
+
+
+class TraceCapture:
+    """Records each written chunk with its time. Disabled when `path` is None."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.enabled = path is not None
+        self._parts: list[bytes] = []
+        self._chunks: list[tuple[int, int, int]] = []
+        self._offset = 0
+        self._t0 = None
+
+    def record(self, text: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._t0 is None:
+            self._t0 = now
+        data = text.encode()
+        self._parts.append(data)
+        self._chunks.append((now - self._t0, self._offset, len(data)))
+        self._offset += len(data)
+
+    def trace(self) -> StreamTrace:
+        return StreamTrace(b"".join(self._parts), self._chunks)
+
+    def save(self) -> str | None:
+        """Write the captured trace to `path`. Returns the path."""
+        if not self.enabled:
+            return None
+        self.trace().save(self.path)
+        return self.path
+
+
+def add_capture_argument(parser):
+    """Add a --capture option to an argparse parser."""
+    parser.add_argument("--capture", metavar="TRACE", default=None,
+                        help="Record chunk sizes and timings to a stream trace file")
@@ -0,0 +1,228 @@
+"""
+Lightweight span/event recorder for the Python writers.
+
+Spans and per-flush events are timestamped with one monotonic clock that is
+anchored to wall-clock time once at import, so durations are immune to clock
+steps while absolute timestamps still line up with the Rust binary's spans
+(see `ag-trace-merge`). Events also carry the raw `time.monotonic_ns()` as a
+`monotonic_ns` attribute: the wall anchor is sampled separately in each
+process, so only the raw clock compares exactly across processes on one host
+(see `ag-watch-probe`). Recorded spans are exported as OTLP/JSON, and
+`load_trace` reads them back, along with the Rust binary's span log.
+
+Recording is opt-in: set AG_PY_TRACE_FILE to the output path. Without it,
+`Recorder.from_env()` returns a disabled recorder whose methods are no-ops.
+Events may come from other threads (a writer pipeline's flushes); they attach
+to the span open on the recording thread.
+"""
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+TRACE_ENV = "AG_PY_TRACE_FILE"
+
+# Offset from the monotonic clock to unix time, taken once per process.
+_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def now_ns() -> int:
+    """Current time in unix nanoseconds, derived from the monotonic clock."""
+    return time.monotonic_ns() + _EPOCH_OFFSET_NS
+
+
+def otlp_attributes(attrs: dict) -> list[dict]:
+    """Convert a flat dict into an OTLP/JSON attribute list."""
+    out = []
+    for key, value in attrs.items():
+        if isinstance(value, bool):
+            v = {"boolValue": value}
+        elif isinstance(value, int):
+            v = {"intValue": str(value)}
+        elif isinstance(value, float):
+            v = {"doubleValue": value}
+        else:
+            v = {"stringValue": str(value)}
+        out.append({"key": key, "value": v})
+    return out
+
+
+def otlp_document(service: str, spans: list[dict]) -> dict:
+    """Wrap OTLP/JSON spans for one service in a `resourceSpans` document."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": otlp_attributes({"service.name": service})},
+                "scopeSpans": [{"scope": {"name": "artifact-generator"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+RUST_SERVICE = "artifact-generator"
+
+_DURATION_RE = re.compile(r"^([\d.]+)\s*(ns|µs|us|ms|s)$")
+_UNIT_NS = {"ns": 1, "µs": 1_000, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000}
+
+
+def parse_duration_ns(text: str) -> int:
+    """Parse a tracing-subscriber duration such as `1.23ms` or `45.6µs`."""
+    m = _DURATION_RE.match(text.strip())
+    if not m:
+        raise ValueError(f"unrecognised duration: {text!r}")
+    return int(float(m.group(1)) * _UNIT_NS[m.group(2)])
+
+
+def parse_timestamp_ns(text: str) -> int:
+    dt = datetime.fromisoformat(text)
+    return int(dt.timestamp()) * 1_000_000_000 + dt.microsecond * 1_000
+
+
+def load_rust_spans(path: str) -> list[dict]:
+    """Convert span-close records from the Rust JSON log into OTLP/JSON spans.
+
+    Each record carries the close timestamp plus busy/idle time, so the start
+    is reconstructed as close - (busy + idle). Parents are matched by span
+    path: children always close before the span that encloses them.
+    """
+    trace_id = secrets.token_hex(16)
+    spans = []
+    orphans: dict[tuple, list[dict]] = {}
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            fields = rec.get("fields", {})
+            if fields.get("message") != "close":
+                continue
+
+            end_ns = parse_timestamp_ns(rec["timestamp"])
+            busy = parse_duration_ns(fields["time.busy"])
+            idle = parse_duration_ns(fields["time.idle"])
+            attrs = {k: v for k, v in rec.get("span", {}).items() if k != "name"}
+            path_names = tuple(s["name"] for s in rec.get("spans", [rec["span"]]))
+
+            span = {
+                "traceId": trace_id,
+                "spanId": secrets.token_hex(8),
+                "parentSpanId": "",
+                "name": rec["span"]["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(end_ns - busy - idle),
+                "endTimeUnixNano": str(end_ns),
+                "attributes": otlp_attributes(attrs),
+                "events": [],
+            }
+            for child in orphans.pop(path_names, []):
+                child["parentSpanId"] = span["spanId"]
+            if len(path_names) > 1:
+                orphans.setdefault(path_names[:-1], []).append(span)
+            spans.append(span)
+
+    return spans
+
+
+def load_trace(path: str) -> list[dict]:
+    """Load a trace file as a list of OTLP `resourceSpans` entries."""
+    with open(path) as f:
+        try:
+            doc = json.load(f)
+        except json.JSONDecodeError:
+            doc = None
+    if isinstance(doc, dict) and "resourceSpans" in doc:
+        return doc["resourceSpans"]
+    return otlp_document(RUST_SERVICE, load_rust_spans(path))["resourceSpans"]
+
+
+class _Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attrs", "events")
+
+    def __init__(self, name: str, parent_id: str, attrs: dict):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = now_ns()
+        self.end_ns = 0
+        self.attrs = attrs
+        self.events = []
+
+
+class Recorder:
+    """Collects nested spans and events for one writer run."""
+
+    def __init__(self, service: str, path: str | None = None):
+        self.service = service
+        self.path = path
+        self.enabled = path is not None
+        self.trace_id = secrets.token_hex(16)
+        self._stack: list[_Span] = []
+        self._done: list[_Span] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, service: str) -> "Recorder":
+        return cls(service, os.environ.get(TRACE_ENV) or None)
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a writer phase. Nests under the open span."""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, attrs)
+
+    @contextmanager
+    def _span(self, name: str, attrs: dict):
+        parent = self._stack[-1].span_id if self._stack else ""
+        span = _Span(name, parent, attrs)
+        with self._lock:
+            self._stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end_ns = now_ns()
+            with self._lock:
+                self._stack.pop()
+                self._done.append(span)
+
+    def event(self, name: str, **attrs):
+        """Record a point-in-time event (e.g. one flush) on the open span."""
+        if not self.enabled:
+            return
+        mono = time.monotonic_ns()
+        attrs["monotonic_ns"] = mono
+        with self._lock:
+            if self._stack:
+                self._stack[-1].events.append((mono + _EPOCH_OFFSET_NS, name, attrs))
+
+    def to_otlp(self) -> dict:
+        spans = []
+        for s in sorted(self._done, key=lambda s: s.start_ns):
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id,
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": otlp_attributes(s.attrs),
+                "events": [
+                    {"timeUnixNano": str(t), "name": n, "attributes": otlp_attributes(a)}
+                    for t, n, a in s.events
+                ],
+            })
+        return otlp_document(self.service, spans)
+
+    def export(self) -> str | None:
+        """Write recorded spans to the configured path. Returns the path."""
+        if not self.enabled:
+            return None
+        with open(self.path, "w") as f:
+            json.dump(self.to_otlp(), f)
+        return self.path
@@ -0,0 +1,90 @@
+"""Regression tests for the shared-memory ring (run: uv run --project tools pytest tools/tests)."""
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from artifact_generator.shmring import _ATTACHED, RingOverrun, RingReader, RingWriter
+
+CAPACITY = 1024
+
+
+def _name(tag: str) -> str:
+    return f"ag-test-{tag}-{os.getpid()}"
+
+
+def _write_in_thread(writer: RingWriter, chunks: list[bytes]) -> threading.Thread:
+    t = threading.Thread(target=lambda: [writer.write(c) for c in chunks], daemon=True)
+    t.start()
+    return t
+
+
+def test_reader_attaching_after_wrap_starts_at_tail_without_stalling_writer():
+    with RingWriter(_name("wrap"), capacity=CAPACITY) as writer:
+        for i in range(100):
+            writer.write(f"old-{i:03d}".encode())  # wraps the ring several times
+        with RingReader(_name("wrap")) as reader:
+            chunks = [f"new-{i:03d}".encode() for i in range(50)]
+            t = _write_in_thread(writer, chunks)
+            t.join(2.0)
+            assert not t.is_alive(), "writer stalled on a reader that attached after wrap"
+            assert [payload for _, payload in reader.read()] == chunks
+
+
+def test_attached_reader_is_not_overwritten():
+    with RingWriter(_name("wait"), capacity=CAPACITY) as writer:
+        with RingReader(_name("wait")) as reader:
+            chunks = [f"chunk-{i:04d}".encode() * 4 for i in range(200)]
+            t = _write_in_thread(writer, chunks)
+            got = []
+            while len(got) < len(chunks):
+                got.extend(payload for _, payload in reader.read())
+            t.join(2.0)
+            assert got == chunks
+
+
+def test_idle_reader_is_detached_after_timeout():
+    with RingWriter(_name("idle"), capacity=CAPACITY, reader_timeout=0.1) as writer:
+        with RingReader(_name("idle")) as reader:
+            t = _write_in_thread(writer, [b"x" * 100] * 50)
+            t.join(2.0)
+            assert not t.is_alive(), "writer hung on a reader that stopped consuming"
+            with pytest.raises(RingOverrun):
+                reader.read()
+
+
+def test_overwrite_during_copy_is_detected():
+    with RingWriter(_name("copy"), capacity=CAPACITY) as writer:
+        with RingReader(_name("copy")) as reader:
+            writer.write(b"a" * 400)
+            reader.buf[_ATTACHED] = 0  # as if the writer had timed the reader out
+            get = reader._get
+
+            def racing_get(pos, n):
+                block = get(pos, n)
+                for _ in range(10):
+                    writer.write(b"b" * 400)  # laps the block mid-copy
+                return block
+
+            reader._get = racing_get
+            with pytest.raises(RingOverrun):
+                reader.read()
+
+
+def test_name_held_by_live_writer_is_refused():
+    with RingWriter(_name("live"), capacity=CAPACITY):
+        with pytest.raises(FileExistsError):
+            RingWriter(_name("live"), capacity=CAPACITY)
+
+
+def test_ring_left_by_exited_writer_is_reused():
+    name = _name("stale")
+    # The child exits without close(), leaving its segment behind.
+    code = f"import os; from artifact_generator.shmring import RingWriter; RingWriter({name!r}); os._exit(0)"
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": src})
+    with RingWriter(name, capacity=CAPACITY) as writer, RingReader(name) as reader:
+        writer.write(b"fresh")
+        assert [payload for _, payload in reader.read()] == [b"fresh"]